@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: bytes retained per normalized event as the original
+12-key dict vs. the interned Event NamedTuple.
+
+Usage:
+    python backend/benchmarks/bench_event_memory.py [--events 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from connectors.getinvolved import (  # noqa: E402
+    API_URL,
+    SOURCE,
+    _normalize_api_event,
+    _to_utc_iso,
+    infer_campus,
+    make_event_id,
+    strip_html,
+)
+
+ORGS = [f"Rutgers Club {i}" for i in range(400)]
+CATEGORIES = ["Social", "Academic", "Cultural", "Service", "Sports", "Arts"]
+LOCATIONS = ["Busch Student Center", "Zoom", "Scott Hall 123", "Tillett Hall",
+             "Cook Student Center", "TBD", "Hill Center 114"]
+
+
+def legacy_normalize_api_event(raw: dict) -> dict | None:
+    """_normalize_api_event as it was before the Event record."""
+    title = (raw.get("name") or "").strip()
+    start_iso = _to_utc_iso(raw.get("startsOn"))
+    if not title or not start_iso:
+        return None
+    location = (raw.get("location") or "").strip() or None
+    org = (raw.get("organizationName") or "").strip() or None
+    categories = raw.get("categoryNames") or []
+    category = ", ".join(c for c in categories if c).strip() or None
+    return {
+        "event_id":    make_event_id(title, start_iso, SOURCE),
+        "source":      SOURCE,
+        "title":       title,
+        "description": strip_html(raw.get("description")),
+        "start_time":  start_iso,
+        "end_time":    _to_utc_iso(raw.get("endsOn")),
+        "location":    location,
+        "campus":      infer_campus(location),
+        "organization": org,
+        "category":    category,
+        "source_url":  f"https://rutgers.campuslabs.com/engage/event/{raw['id']}"
+                       if raw.get("id") else API_URL,
+        "last_seen":   datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def synthetic_raw_events(n: int) -> list[dict]:
+    rng = random.Random(42)
+    raws = [{
+        "id": i,
+        "name": f"Event {i}",
+        "startsOn": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T18:00:00Z",
+        "endsOn": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T20:00:00Z",
+        "location": rng.choice(LOCATIONS),
+        "organizationName": rng.choice(ORGS),
+        "categoryNames": [rng.choice(CATEGORIES)],
+        "description": f"<p>Come to event {i}!</p>",
+    } for i in range(n)]
+    # Round-trip through JSON so every string is its own object, as with
+    # real API responses.
+    return json.loads(json.dumps(raws))
+
+
+def retained_bytes(build, raws: list[dict]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    records = [build(raw) for raw in raws]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    raws = synthetic_raw_events(args.events)
+    for name, build in (("dict", legacy_normalize_api_event),
+                        ("Event", _normalize_api_event)):
+        total = retained_bytes(build, raws)
+        print(f"{name:<6} {total / args.events:8.1f} B/event  "
+              f"({total / 2**20:.1f} MiB for {args.events} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN ANALYZE benchmark: the app's event queries on synthetic data,
+before and after the migrations in backend/migrations/.
+
+Needs DATABASE_URL in .env (a local `supabase start` stack works).  Data is
+loaded into a scratch "bench" schema with a copy of the events table and
+schema.sql's original indexes; the migrations are then applied to that
+copy with search_path pointing at it.  The schema is dropped afterwards.
+
+Usage:
+    python backend/benchmarks/bench_event_queries.py [--rows 500000] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parents[2] / ".env")
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+CAMPUSES = ["College Ave", "Busch", "Livingston", "Cook/Douglass", "Online",
+            "Off-Campus", "Unknown"]
+SOURCES = ["getinvolved", "athletics", "libraries"]
+
+_SETUP = """
+    DROP SCHEMA IF EXISTS bench CASCADE;
+    CREATE SCHEMA bench;
+    SET search_path = bench, public, extensions;
+    CREATE TABLE events (LIKE public.events INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+                         INCLUDING GENERATED);
+    CREATE INDEX events_source_idx     ON events (source);
+    CREATE INDEX events_campus_idx     ON events (campus);
+    CREATE INDEX events_start_time_idx ON events (start_time);
+"""
+
+# Two years of events centred on today, so about half are upcoming; most
+# were last seen recently and a tail has gone stale.
+_LOAD = """
+    INSERT INTO events (event_id, source, title, start_time, end_time, campus,
+                        source_url, last_seen)
+    SELECT 'bench-' || i,
+           (%(sources)s::text[])[1 + i %% cardinality(%(sources)s::text[])],
+           'Bench ' || i,
+           start_time,
+           start_time + interval '2 hours',
+           (%(campuses)s::text[])[1 + (i / 7) %% cardinality(%(campuses)s::text[])],
+           'https://example.invalid/' || i,
+           now() - (random() ^ 4) * interval '60 days'
+    FROM generate_series(1, %(rows)s) AS i,
+         LATERAL (SELECT now() + (random() - 0.5) * interval '730 days' AS start_time) AS s
+"""
+
+QUERIES = {
+    "campus upcoming": """
+        SELECT * FROM events
+        WHERE campus = 'Busch'
+          AND coalesce(end_time, start_time) >= {cutoff}
+          AND coalesce(end_time, start_time) >= now()
+        ORDER BY start_time LIMIT 50
+    """,
+    "source upcoming": """
+        SELECT * FROM events
+        WHERE source = 'getinvolved' AND start_time >= now()
+        ORDER BY start_time LIMIT 50
+    """,
+    "stale sweep": """
+        SELECT count(*) FROM events WHERE last_seen < now() - interval '30 days'
+    """,
+}
+
+
+def explain(conn: psycopg.Connection, sql: str, rounds: int) -> tuple[float, str]:
+    """Median execution time (ms) and the top-level scan nodes used."""
+    samples, plan = [], None
+    for _ in range(rounds):
+        plan = conn.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}").fetchone()[0][0]
+        samples.append(plan["Execution Time"])
+    return statistics.median(samples), ", ".join(_scans(plan["Plan"]))
+
+
+def _scans(node: dict) -> list[str]:
+    found = []
+    if "Scan" in node["Node Type"]:
+        found.append(f"{node['Node Type']} {node.get('Index Name', '')}".strip())
+    for child in node.get("Plans", []):
+        found.extend(_scans(child))
+    return found
+
+
+def run_queries(conn: psycopg.Connection, label: str, rounds: int) -> None:
+    cutoff = conn.execute(
+        "SELECT coalesce((SELECT quote_literal(cutoff) FROM upcoming_cutoff), 'now()')"
+    ).fetchone()[0] if label == "after" else "now()"
+    for name, sql in QUERIES.items():
+        median, scans = explain(conn, sql.format(cutoff=cutoff), rounds)
+        print(f"{label:<6} {name:<16} {median:>9.3f} ms  {scans}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with psycopg.connect(os.environ["DATABASE_URL"], autocommit=True) as conn:
+        try:
+            conn.execute(_SETUP)
+            conn.execute(_LOAD, {"sources": SOURCES, "campuses": CAMPUSES,
+                                 "rows": args.rows})
+            conn.execute("VACUUM ANALYZE events")
+            run_queries(conn, "before", args.rounds)
+
+            # 005 (partitioning) is measured separately by bench_partitions.py.
+            for migration in sorted(MIGRATIONS_DIR.glob("00[1-4]_*.sql")):
+                conn.execute(migration.read_text())
+            conn.execute("VACUUM ANALYZE events")
+            run_queries(conn, "after", args.rounds)
+
+            correlation = conn.execute(
+                "SELECT correlation FROM pg_stats "
+                "WHERE schemaname = 'bench' AND tablename = 'events' "
+                "AND attname = 'last_seen'"
+            ).fetchone()
+            print(f"last_seen correlation: {correlation[0] if correlation else 'n/a'}")
+        finally:
+            conn.execute("DROP SCHEMA IF EXISTS bench CASCADE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fuzzy search benchmark: p50/p99 latency of fuzzy_search_events() and
+search_organizations() for misspelled queries over synthetic events.
+
+Needs DATABASE_URL in .env pointing at a database with schema.sql and the
+migrations applied (a local `supabase start` stack works).  Rows are
+loaded into copies of events and organizations in a scratch schema,
+bench_fuzzy, which is dropped afterwards.
+
+Usage:
+    python backend/benchmarks/bench_fuzzy_search.py [--rows 500000] [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_search import (  # noqa: E402  (also loads .env)
+    create_scratch_events,
+    percentiles,
+    synthetic_rows,
+    time_ms,
+)
+
+# Typos of the synthetic titles and "Rutgers <Word> Society" organizations.
+QUERIES = ["hackaton", "robtics", "jaz concrt", "chees tournment", "vollyball",
+           "rutgres anime", "phtography", "entreprenuer", "meditaton", "karoke"]
+SCHEMA = "bench_fuzzy"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with psycopg.connect(os.environ["DATABASE_URL"], autocommit=True) as conn:
+        try:
+            create_scratch_events(conn, SCHEMA)
+            conn.execute("CREATE TABLE organizations (LIKE public.organizations INCLUDING ALL)")
+            with conn.cursor().copy(
+                "COPY events (event_id, source, title, description, start_time, "
+                "end_time, location, organization, category, source_url) FROM STDIN"
+            ) as copy:
+                for row in synthetic_rows(args.rows):
+                    copy.write_row(row)
+            conn.execute("VACUUM ANALYZE events")
+            started = time.perf_counter()
+            orgs = conn.execute("SELECT refresh_organizations()").fetchone()[0]
+            print(f"refresh_organizations: {orgs} names in "
+                  f"{(time.perf_counter() - started) * 1e3:.0f} ms")
+
+            for name, sql in (
+                ("events", "SELECT * FROM fuzzy_search_events(%s, 10)"),
+                ("orgs", "SELECT * FROM search_organizations(%s, 10)"),
+            ):
+                samples, example = [], None
+                for i in range(args.rounds):
+                    ms, rows = time_ms(conn, sql, (QUERIES[i % len(QUERIES)],))
+                    samples.append(ms)
+                    example = example or (QUERIES[i % len(QUERIES)], rows[:1])
+                p50, p99 = percentiles(samples)
+                print(f"{name:<7} p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms   e.g. {example}")
+        finally:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main()
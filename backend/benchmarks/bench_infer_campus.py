@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: the Aho-Corasick campus matcher (uncached and through the
+infer_campus LRU) vs. the original per-keyword substring scan.
+
+Usage:
+    python backend/benchmarks/bench_infer_campus.py [--rounds 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from connectors.getinvolved import (  # noqa: E402
+    CAMPUS_KEYWORDS,
+    OFF_CAMPUS_KEYWORDS,
+    ONLINE_KEYWORDS,
+    TBD_PATTERNS,
+    _match_campus,
+    infer_campus,
+)
+
+# Location strings as they appear in Campus Labs events.
+LOCATIONS = [
+    "Busch Student Center, Multipurpose Room A",
+    "Livingston Student Center - Room 202AB",
+    "College Avenue Student Center, Multipurpose Room",
+    "Zoom",
+    "https://rutgers.zoom.us/j/91234567890",
+    "Microsoft Teams Meeting",
+    "TBD",
+    "To Be Announced",
+    "Cook Student Center, Cook Café",
+    "Douglass Student Center - Trayes Hall",
+    "Hill Center, Room 114",
+    "Scott Hall 123",
+    "Werblin Recreation Center",
+    "Rutgers Zimmerli Art Museum",
+    "Tillett Hall 103A",
+    "Richard Weeks Hall of Engineering, Room 102",
+    "The Yard @ College Ave",
+    "Liberty Science Center, Jersey City",
+    "Johnson Park, Piscataway",
+    "123 Easton Ave, New Brunswick, NJ 08901",
+    "Alexander Library, Scholarly Communication Center",
+    "Passion Puddle",
+    "Online via Zoom",
+    "Room 201",
+]
+
+
+def legacy_infer_campus(location: str | None) -> str:
+    """infer_campus as it was before the keyword automaton."""
+    if not location:
+        return "Unknown"
+    loc_lower = location.lower()
+    for pat in TBD_PATTERNS:
+        if loc_lower.startswith(pat):
+            return "Unknown"
+    for kw in ONLINE_KEYWORDS:
+        if kw in loc_lower:
+            return "Online"
+    for campus, keywords in CAMPUS_KEYWORDS.items():
+        for kw in keywords:
+            if kw.lower() in loc_lower:
+                return campus
+    for kw in OFF_CAMPUS_KEYWORDS:
+        if kw.lower() in loc_lower:
+            return "Off-Campus"
+    return "Unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    mismatches = [
+        (loc, legacy_infer_campus(loc), infer_campus(loc))
+        for loc in LOCATIONS
+        if legacy_infer_campus(loc) != infer_campus(loc)
+    ]
+    if mismatches:
+        for loc, old, new in mismatches:
+            print(f"MISMATCH {loc!r}: legacy={old} new={new}")
+        sys.exit(1)
+
+    calls = args.rounds * len(LOCATIONS)
+    variants = (
+        ("legacy", legacy_infer_campus),
+        ("automaton", lambda loc: _match_campus(loc.lower())),
+        ("cached", infer_campus),
+    )
+    for name, fn in variants:
+        secs = min(timeit.repeat(lambda: [fn(loc) for loc in LOCATIONS],
+                                 number=args.rounds, repeat=3))
+        print(f"{name:<10} {secs * 1e6 / calls:8.2f} µs/call  ({calls} calls)")
+
+
+if __name__ == "__main__":
+    main()
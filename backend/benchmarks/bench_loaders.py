@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: the PostgREST upsert_events() RPC vs. the Postgres
+COPY loader, writing synthetic events into the same database.
+
+Needs SUPABASE_URL, SUPABASE_SERVICE_KEY and DATABASE_URL in .env — a local
+stack from `supabase start` works.  Both paths write to the live events
+table (PostgREST only serves the exposed schemas, so a scratch schema is
+not an option): rows are written with source "benchmark" and deleted
+afterwards, and a non-local database is refused unless --allow-remote is
+given.
+
+Usage:
+    python backend/benchmarks/bench_loaders.py [--events 50000] [--batch-size 500]
+                                               [--allow-remote]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parents[2] / ".env")
+
+import psycopg  # noqa: E402
+from psycopg.conninfo import conninfo_to_dict  # noqa: E402
+from supabase import create_client  # noqa: E402
+
+from connectors.getinvolved import Event, _upsert_events, content_fingerprint  # noqa: E402
+from connectors.pg_copy import PostgresCopySink  # noqa: E402
+from connectors.sinks import SupabaseSink  # noqa: E402
+
+BENCH_SOURCE = "benchmark"
+LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1", "host.docker.internal"}
+
+
+def is_local(supabase_url: str, dsn: str) -> bool:
+    """True if both the REST endpoint and the database are on this machine."""
+    db_host = conninfo_to_dict(dsn).get("host") or ""
+    return (urlsplit(supabase_url).hostname or "") in LOCAL_HOSTS and \
+        all(host in LOCAL_HOSTS or host.startswith("/") for host in db_host.split(","))
+
+
+def synthetic_events(n: int, title: str) -> list[Event]:
+    return [Event(
+        event_id=f"bench-{i}",
+        source=BENCH_SOURCE,
+        title=f"{title} {i}",
+        description="Synthetic event written by bench_loaders.py.",
+        start_time="2026-09-01T18:00:00+00:00",
+        end_time="2026-09-01T20:00:00+00:00",
+        location="Busch Student Center",
+        campus="Busch",
+        organization="Benchmark Club",
+        category="Academic",
+        source_url=f"https://example.invalid/event/{i}",
+        last_seen="2026-09-01T00:00:00+00:00",
+    ) for i in range(n)]
+
+
+def write_all(sink, events: list[Event], stored: dict, batch_size: int) -> float:
+    started = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        _upsert_events(sink, events[i:i + batch_size], stored)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="write benchmark rows to a non-local database")
+    args = parser.parse_args()
+
+    url, dsn = os.environ["SUPABASE_URL"], os.environ["DATABASE_URL"]
+    if not args.allow_remote and not is_local(url, dsn):
+        sys.exit("bench_loaders.py writes to the live events table; "
+                 "pass --allow-remote to run it against a non-local database.")
+    client = create_client(url, os.environ["SUPABASE_SERVICE_KEY"])
+    sinks = {"rest": SupabaseSink(client), "copy": PostgresCopySink(dsn)}
+
+    inserts = synthetic_events(args.events, "Bench")
+    updates = synthetic_events(args.events, "Bench (edited)")
+    print(f"{'path':<6} {'insert':>14} {'update':>14} {'unchanged':>14}")
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        try:
+            for name, sink in sinks.items():
+                conn.execute("DELETE FROM events WHERE source = %s", (BENCH_SOURCE,))
+                inserted = write_all(sink, inserts, {}, args.batch_size)
+                stored = {e.event_id: content_fingerprint(e) for e in inserts}
+                updated = write_all(sink, updates, stored, args.batch_size)
+                stored = {e.event_id: content_fingerprint(e) for e in updates}
+                unchanged = write_all(sink, updates, stored, args.batch_size)
+                print(f"{name:<6}" + "".join(
+                    f" {args.events / secs:>10.0f} ev/s"
+                    for secs in (inserted, updated, unchanged)))
+        finally:
+            conn.execute("DELETE FROM events WHERE source = %s", (BENCH_SOURCE,))
+            for sink in sinks.values():
+                sink.close()
+
+
+if __name__ == "__main__":
+    main()
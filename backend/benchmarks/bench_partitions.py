@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Partitioning benchmark: upcoming-event queries and upsert / touch latency
+on a plain events table vs. the monthly-partitioned layout from
+migrations/005_partition_events.sql, at multi-million-row scale.
+
+Needs DATABASE_URL in .env pointing at a database with schema.sql and
+migrations 001-004 applied (a local `supabase start` stack works).  Both
+layouts are built in scratch schemas (bench_plain, bench_part), each with
+its own event_counts and upcoming_cutoff, which are dropped afterwards.
+The migration also creates the archive schema; it is dropped again if it
+did not exist before and is still empty.
+
+Usage:
+    python backend/benchmarks/bench_partitions.py [--rows 3000000] [--batches 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parents[2] / ".env")
+
+MIGRATION = Path(__file__).resolve().parent.parent / "migrations" / "005_partition_events.sql"
+BENCH_SOURCE = "benchmark"
+BASE = datetime(2023, 1, 1, tzinfo=timezone.utc)
+SPAN_SECS = 5 * 365 * 86400  # 2023 through 2027
+CAMPUSES = ["College Ave", "Busch", "Livingston", "Cook/Douglass", "Online", "Unknown"]
+
+# Same columns, indexes and counter triggers as public.events after schema.sql
+# and 001-004; the partitioned copy is built from it by migration 005.
+_CREATE_PLAIN = """
+    CREATE TABLE events (
+        id           uuid        PRIMARY KEY DEFAULT gen_random_uuid(),
+        event_id     text        UNIQUE NOT NULL,
+        source       text        NOT NULL,
+        title        text        NOT NULL,
+        description  text,
+        start_time   timestamptz NOT NULL,
+        end_time     timestamptz,
+        location     text,
+        campus       text,
+        organization text,
+        category     text,
+        source_url   text        NOT NULL,
+        last_seen    timestamptz NOT NULL DEFAULT now(),
+        created_at   timestamptz NOT NULL DEFAULT now(),
+        content_hash text,
+        search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(organization, '') || ' ' ||
+                                             coalesce(category, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(location, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'D')
+        ) STORED
+    )
+"""
+
+# event i starts at BASE + ((i * 7919) % rows) * step seconds, so the batch
+# generator below can recompute any stored row's start_time.
+_LOAD = """
+    INSERT INTO events (event_id, source, title, start_time, end_time, campus,
+                        organization, source_url, content_hash)
+    SELECT 'bench-' || i, %(source)s, 'Bench event ' || i,
+           %(base)s::timestamptz + ((i::bigint * 7919) %% %(rows)s) * %(step)s * interval '1 second',
+           %(base)s::timestamptz + ((i::bigint * 7919) %% %(rows)s) * %(step)s * interval '1 second'
+               + interval '2 hours',
+           (%(campuses)s::text[])[1 + i %% cardinality(%(campuses)s::text[])],
+           'Club ' || (i %% 2000),
+           'https://example.invalid/' || i,
+           md5(i::text)
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+_INDEXES = """
+    CREATE INDEX events_start_time_idx   ON events (start_time);
+    CREATE INDEX events_campus_start_idx ON events (campus, start_time);
+    CREATE INDEX events_source_start_idx ON events (source, start_time);
+    CREATE INDEX events_search_idx       ON events USING gin (search_vector);
+    CREATE INDEX events_title_trgm_idx   ON events USING gist (title gist_trgm_ops);
+    CREATE INDEX events_organization_trgm_idx ON events USING gist (organization gist_trgm_ops);
+    CREATE TRIGGER events_count_insert AFTER INSERT ON events
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+    CREATE TRIGGER events_count_update AFTER UPDATE ON events
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+"""
+
+# The trigger functions and refresh_upcoming_index() stay in public; their
+# unqualified table names resolve through search_path to these copies.
+_SCRATCH_TABLES = """
+    CREATE TABLE event_counts    (LIKE public.event_counts    INCLUDING ALL);
+    CREATE TABLE upcoming_cutoff (LIKE public.upcoming_cutoff INCLUDING ALL);
+"""
+
+_UPSERT = """
+    INSERT INTO events (event_id, source, title, start_time, end_time, campus,
+                        source_url, last_seen, content_hash)
+    SELECT * FROM jsonb_to_recordset(%s::jsonb) AS e (
+        event_id text, source text, title text, start_time timestamptz,
+        end_time timestamptz, campus text, source_url text,
+        last_seen timestamptz, content_hash text)
+    ON CONFLICT ({conflict}) DO UPDATE SET
+        title = excluded.title, end_time = excluded.end_time,
+        campus = excluded.campus, last_seen = excluded.last_seen,
+        content_hash = excluded.content_hash
+"""
+
+_TOUCH = "UPDATE events SET last_seen = now() WHERE event_id = ANY (%s)"
+
+QUERIES = {
+    "campus upcoming": """
+        SELECT * FROM events WHERE campus = 'Busch' AND start_time >= now()
+        ORDER BY start_time LIMIT 50
+    """,
+    "next 7 days": """
+        SELECT count(*) FROM events
+        WHERE start_time >= now() AND start_time < now() + interval '7 days'
+    """,
+    "by event_id": "SELECT * FROM events WHERE event_id = 'bench-12345'",
+}
+
+
+def start_of(i: int, rows: int, step: int) -> datetime:
+    return BASE + timedelta(seconds=((i * 7919) % rows) * step)
+
+
+def batches(rows: int, step: int, count: int, size: int):
+    """(upsert rows, touch ids) pairs: half edits of stored events, half new."""
+    rng = random.Random(7)
+    now = datetime.now(timezone.utc)
+    for b in range(count):
+        existing = rng.sample(range(1, rows + 1), size)
+        upserts = []
+        for i in existing[:size // 2]:
+            start = start_of(i, rows, step)
+            upserts.append({"event_id": f"bench-{i}", "start_time": start.isoformat(),
+                            "end_time": (start + timedelta(hours=3)).isoformat(),
+                            "title": f"Bench event {i} (edited)", "campus": "Busch"})
+        for k in range(size // 2):
+            start = now + timedelta(days=rng.uniform(0, 365))
+            upserts.append({"event_id": f"bench-new-{b}-{k}", "start_time": start.isoformat(),
+                            "end_time": (start + timedelta(hours=2)).isoformat(),
+                            "title": f"New bench event {b}-{k}", "campus": "Livingston"})
+        for row in upserts:
+            row.update(source=BENCH_SOURCE, source_url="https://example.invalid/new",
+                       last_seen=now.isoformat(), content_hash="edited")
+        touch = [f"bench-{i}" for i in existing[size // 2:]]
+        yield json.dumps(upserts), touch
+
+
+def timed_ms(conn: psycopg.Connection, sql: str, params=None) -> float:
+    started = time.perf_counter()
+    conn.execute(sql, params)
+    return (time.perf_counter() - started) * 1e3
+
+
+def p50_p99(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):>8.2f} ms   p99 {p99:>8.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    step = SPAN_SECS // args.rows
+    dsn = os.environ["DATABASE_URL"]
+
+    with psycopg.connect(dsn, autocommit=True) as plain, \
+            psycopg.connect(dsn, autocommit=True) as part:
+        had_archive = plain.execute(
+            "SELECT to_regnamespace('archive') IS NOT NULL").fetchone()[0]
+        try:
+            for conn, schema in ((plain, "bench_plain"), (part, "bench_part")):
+                conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+                conn.execute(f"CREATE SCHEMA {schema}")
+                conn.execute(f"SET search_path = {schema}, public, extensions")
+                conn.execute(_SCRATCH_TABLES)
+
+            started = time.perf_counter()
+            plain.execute(_CREATE_PLAIN)
+            plain.execute(_LOAD, {"source": BENCH_SOURCE, "base": BASE, "rows": args.rows,
+                                  "step": step, "campuses": CAMPUSES})
+            plain.execute(_INDEXES)
+            print(f"plain: loaded {args.rows} rows in {time.perf_counter() - started:.0f} s")
+
+            started = time.perf_counter()
+            part.execute("CREATE TABLE events (LIKE bench_plain.events INCLUDING ALL)")
+            part.execute("""
+                INSERT INTO events (id, event_id, source, title, start_time, end_time,
+                                    campus, organization, source_url, content_hash)
+                SELECT id, event_id, source, title, start_time, end_time,
+                       campus, organization, source_url, content_hash
+                FROM bench_plain.events
+            """)
+            part.execute(MIGRATION.read_text())
+            partitions = part.execute(
+                "SELECT count(*) FROM pg_inherits WHERE inhparent = 'events'::regclass"
+            ).fetchone()[0]
+            print(f"part:  converted to {partitions} partitions in "
+                  f"{time.perf_counter() - started:.0f} s")
+            for conn in (plain, part):
+                conn.execute("VACUUM ANALYZE events")
+
+            for name, sql in QUERIES.items():
+                for label, conn in (("plain", plain), ("part", part)):
+                    samples = [timed_ms(conn, sql) for _ in range(args.rounds)]
+                    print(f"{name:<16} {label:<6} {p50_p99(samples)}")
+
+            for label, conn, conflict in (("plain", plain, "event_id"),
+                                          ("part", part, "event_id, start_time")):
+                upsert_ms, touch_ms = [], []
+                upsert_sql = _UPSERT.format(conflict=conflict)
+                for rows_json, touch in batches(args.rows, step, args.batches, args.batch_size):
+                    upsert_ms.append(timed_ms(conn, upsert_sql, (rows_json,)))
+                    touch_ms.append(timed_ms(conn, _TOUCH, (touch,)))
+                print(f"{'upsert batch':<16} {label:<6} {p50_p99(upsert_ms)}")
+                print(f"{'touch batch':<16} {label:<6} {p50_p99(touch_ms)}")
+        finally:
+            plain.execute("DROP SCHEMA IF EXISTS bench_plain CASCADE")
+            part.execute("DROP SCHEMA IF EXISTS bench_part CASCADE")
+            if not had_archive:
+                # Without CASCADE: fails rather than drop anything put there since.
+                plain.execute("DROP SCHEMA IF EXISTS archive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Search benchmark: p50/p99 latency of search_events() (first page and a
+keyset-paginated deep page) vs. the ILIKE scan it replaces, over 500k
+synthetic events.
+
+Needs DATABASE_URL in .env pointing at a database with schema.sql and
+migrations/003_search.sql applied (a local `supabase start` stack works).
+Rows are loaded into a copy of events (with its indexes) in a scratch
+schema, bench_search, which is dropped afterwards; search_events() finds
+the copy through search_path.
+
+Usage:
+    python backend/benchmarks/bench_search.py [--rows 500000] [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parents[2] / ".env")
+
+BENCH_SOURCE = "benchmark"
+SCHEMA = "bench_search"
+VOCABULARY = (
+    "club meeting general body workshop career fair resume networking "
+    "research seminar lecture talk panel alumni speaker dance music concert "
+    "jazz choir theater film screening game night trivia tournament chess "
+    "coding hackathon robotics engineering biology chemistry physics math "
+    "volunteer service community cleanup food drive fundraiser charity "
+    "cultural festival heritage celebration dinner pizza coffee study break "
+    "yoga meditation wellness fitness run basketball soccer volleyball "
+    "tennis swim art gallery exhibit painting photography poetry writing "
+    "book reading library debate politics election voter registration "
+    "entrepreneurship startup pitch finance investing marketing design "
+    "sustainability climate garden farm market sale craft knitting anime "
+    "gaming esports karaoke comedy improv open mic orientation welcome"
+).split()
+ORGS = [f"Rutgers {word.title()} Society" for word in VOCABULARY[:120]]
+LOCATIONS = ["Busch Student Center", "Livingston Student Center", "Scott Hall",
+             "Cook Student Center", "Zoom", "Hill Center", "Tillett Hall"]
+QUERIES = ["career fair", "jazz concert", "hackathon", "\"food drive\"",
+           "yoga OR meditation", "chess -tournament", "robotics club",
+           "study break pizza", "voter registration", "anime"]
+
+
+def synthetic_rows(n: int):
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    for i in range(n):
+        start = now + timedelta(minutes=rng.randint(-300_000, 300_000))
+        yield (
+            f"bench-{i}",
+            BENCH_SOURCE,
+            " ".join(rng.choices(VOCABULARY, k=rng.randint(3, 7))).title(),
+            " ".join(rng.choices(VOCABULARY, k=rng.randint(30, 120))),
+            start,
+            start + timedelta(hours=2),
+            rng.choice(LOCATIONS),
+            rng.choice(ORGS),
+            rng.choice(["Social", "Academic", "Cultural", "Service", "Sports"]),
+            f"https://example.invalid/{i}",
+        )
+
+
+def create_scratch_events(conn: psycopg.Connection, schema: str) -> None:
+    """Put an empty copy of public.events first on ``conn``'s search_path."""
+    conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    conn.execute(f"CREATE SCHEMA {schema}")
+    conn.execute(f"SET search_path = {schema}, public, extensions")
+    conn.execute("CREATE TABLE events (LIKE public.events INCLUDING ALL)")
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    return statistics.median(ordered), ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def time_ms(conn: psycopg.Connection, sql: str, params: tuple) -> tuple[float, list]:
+    started = time.perf_counter()
+    rows = conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - started) * 1e3, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--deep-pages", type=int, default=10)
+    args = parser.parse_args()
+
+    with psycopg.connect(os.environ["DATABASE_URL"], autocommit=True) as conn:
+        try:
+            create_scratch_events(conn, SCHEMA)
+            started = time.perf_counter()
+            with conn.cursor().copy(
+                "COPY events (event_id, source, title, description, start_time, "
+                "end_time, location, organization, category, source_url) FROM STDIN"
+            ) as copy:
+                for row in synthetic_rows(args.rows):
+                    copy.write_row(row)
+            print(f"load {args.rows} rows: {time.perf_counter() - started:.1f} s")
+            conn.execute("VACUUM ANALYZE events")
+
+            first, deep, ilike = [], [], []
+            for i in range(args.rounds):
+                query = QUERIES[i % len(QUERIES)]
+                ms, rows = time_ms(conn, "SELECT * FROM search_events(%s, 20)", (query,))
+                first.append(ms)
+                # Walk a few pages by keyset, timing only the last one.
+                for _ in range(args.deep_pages):
+                    if len(rows) < 20:
+                        break
+                    last = rows[-1]
+                    ms, rows = time_ms(
+                        conn, "SELECT * FROM search_events(%s, 20, %s, %s)",
+                        (query, last[-1], last[0]))
+                deep.append(ms)
+                if i < len(QUERIES):  # the sequential scan is slow; sample each query once
+                    word = query.strip('"').split()[0]
+                    ms, _ = time_ms(
+                        conn,
+                        "SELECT event_id FROM events "
+                        "WHERE (title ILIKE %s OR description ILIKE %s) "
+                        "AND coalesce(end_time, start_time) >= now() LIMIT 20",
+                        (f"%{word}%", f"%{word}%"))
+                    ilike.append(ms)
+
+            for name, samples in (("search p1", first),
+                                  (f"search p{args.deep_pages + 1}", deep),
+                                  ("ILIKE", ilike)):
+                p50, p99 = percentiles(samples)
+                print(f"{name:<11} p50 {p50:>8.2f} ms   p99 {p99:>8.2f} ms   (n={len(samples)})")
+        finally:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main()
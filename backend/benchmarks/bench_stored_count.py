@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: count(*) over a source vs. the trigger-maintained
+stored_event_count() lookup, at 1M rows.
+
+Needs DATABASE_URL in .env pointing at a database with schema.sql applied
+(a local `supabase start` stack works).  Rows are loaded into copies of
+events and event_counts in a scratch schema (bench_counts), wired to the
+same trigger functions, which is dropped afterwards.
+
+Usage:
+    python backend/benchmarks/bench_stored_count.py [--rows 1000000] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parents[2] / ".env")
+
+BENCH_SOURCE = "benchmark"
+SCHEMA = "bench_counts"
+CAMPUSES = ["College Ave", "Busch", "Livingston", "Cook/Douglass", "Online", "Unknown"]
+
+_LOAD = """
+    INSERT INTO events (event_id, source, title, start_time, campus, source_url)
+    SELECT 'bench-' || i, %(source)s, 'Bench ' || i,
+           now() + i * interval '1 minute',
+           (%(campuses)s::text[])[1 + i %% cardinality(%(campuses)s::text[])],
+           'https://example.invalid/' || i
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+# The trigger functions and stored_event_count() stay in public; their
+# unqualified table names resolve through search_path to the copies.
+_SETUP = """
+    CREATE TABLE events       (LIKE public.events       INCLUDING ALL);
+    CREATE TABLE event_counts (LIKE public.event_counts INCLUDING ALL);
+    CREATE TRIGGER events_count_insert AFTER INSERT ON events
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION public.event_counts_apply();
+"""
+
+
+def timed_ms(conn: psycopg.Connection, sql: str, rounds: int) -> tuple[float, int]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        value = conn.execute(sql, (BENCH_SOURCE,)).fetchone()[0]
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples), value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with psycopg.connect(os.environ["DATABASE_URL"], autocommit=True) as conn:
+        try:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            conn.execute(f"CREATE SCHEMA {SCHEMA}")
+            conn.execute(f"SET search_path = {SCHEMA}, public, extensions")
+            conn.execute(_SETUP)
+            started = time.perf_counter()
+            conn.execute(_LOAD, {"source": BENCH_SOURCE, "campuses": CAMPUSES,
+                                 "rows": args.rows})
+            print(f"load       {time.perf_counter() - started:>9.2f} s  "
+                  f"({args.rows} rows, counters maintained by triggers)")
+            conn.execute("VACUUM ANALYZE events")
+
+            for name, sql in (
+                ("count(*)", "SELECT count(*) FROM events WHERE source = %s"),
+                ("counters", "SELECT stored_event_count(%s)"),
+            ):
+                median, value = timed_ms(conn, sql, args.rounds)
+                print(f"{name:<10} {median:>9.3f} ms  (= {value})")
+        finally:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: strip_html (re.split tokenizer) vs. the original two-regex
+tag strip, on Campus Labs-style descriptions and pathological inputs.
+
+Usage:
+    python backend/benchmarks/bench_strip_html.py [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from connectors.getinvolved import strip_html  # noqa: E402
+
+_LEGACY_TAG_RE = re.compile(r"<[^>]+>")
+_LEGACY_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def legacy_strip_html(text: str | None) -> str | None:
+    """strip_html as it was before entity decoding and block breaks."""
+    if not text:
+        return None
+    cleaned = _LEGACY_TAG_RE.sub(" ", text)
+    cleaned = _LEGACY_WHITESPACE_RE.sub(" ", cleaned).strip()
+    return cleaned or None
+
+
+# Shaped like descriptions from the Engage editor: nested inline markup,
+# entities, lists and inline styles.
+TYPICAL = (
+    '<p><span style="font-family: Arial, sans-serif; font-size: 12pt;">'
+    "Join the <strong>Rutgers Programming Club</strong> for our weekly "
+    "hack night&nbsp;&mdash; pizza &amp; drinks provided! We&#8217;ll be "
+    "working on open-source projects.</span></p>"
+    "<ul><li>Bring a laptop</li><li>No experience needed</li>"
+    '<li>RSVP on <a href="https://rutgers.campuslabs.com/engage/">getINVOLVED'
+    "</a></li></ul><p><em>Questions?</em> Email us at "
+    "club&#64;rutgers.edu.</p><p>&nbsp;</p>"
+)
+LONG = TYPICAL * 40
+PATHOLOGICAL = {
+    # 300 KB of comparisons with "<" but no closing ">".
+    "stray-lt": "if a < b then " * 22_000,
+    # 300 KB pasted from Word: deeply styled spans.
+    "word-paste": ('<span class="MsoNormal" style="mso-bidi-font-family:Calibri">'
+                   "x</span>") * 4_000,
+    # 140 KB of comment openers that are never closed.
+    "open-comment": "<!-- x " * 20_000,
+    # Entity-dense text.
+    "entities": "&nbsp;&amp;&#8217;&lt;" * 15_000,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = {"typical": TYPICAL, "long": LONG, **PATHOLOGICAL}
+    print(f"{'case':<12} {'size':>9} {'legacy':>12} {'strip_html':>12}")
+    for name, text in cases.items():
+        # Large inputs run once: the legacy regex is quadratic on some of them.
+        rounds, repeat = (args.rounds, 3) if len(text) < 50_000 else (1, 1)
+        timings = []
+        for fn in (legacy_strip_html, lambda t: strip_html(t, max_chars=None)):
+            secs = min(timeit.repeat(lambda: fn(text), number=rounds, repeat=repeat))
+            timings.append(secs / rounds * 1e3)
+        print(f"{name:<12} {len(text):>8}B {timings[0]:>10.3f}ms {timings[1]:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
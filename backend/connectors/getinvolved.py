@@ -1,26 +1,45 @@
 """
 getINVOLVED connector for RU Events Hub.
 
-Tries the Campus Labs REST API first; falls back to the public iCal feed
-if the API returns 403 / 429 or any other network error.
+Tries the Campus Labs REST API first; 429 / 503 responses are retried as
+the shared rate limiter backs off.  Falls back to the public iCal feed if
+the API returns 403 or another error, keeps rate limiting past
+MAX_PAGE_RETRIES, asks for a Retry-After longer than MAX_RETRY_AFTER, or
+fails at the network level.
 """
 
 from __future__ import annotations
 
 import hashlib
+import html
 import json
 import logging
 import re
+import sys
+import threading
 import time
-from datetime import datetime, timezone
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, NamedTuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from dateutil import parser as dateutil_parser
-from icalendar import Calendar
+from icalendar import Event as ICalEvent
 from supabase import Client
 
+from connectors.sinks import EventSink, RowsRejected, SupabaseSink
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -35,11 +54,44 @@ API_URL = "https://rutgers.campuslabs.com/engage/api/discovery/event/search"
 ICAL_URL = "https://rutgers.campuslabs.com/engage/events/ical"
 
 PAGE_SIZE = 100          # events per API page
-PAGE_DELAY = 2.0         # seconds between paginated requests
+API_WORKERS = 4          # concurrent page requests once totalItems is known
+POOL_SIZE = API_WORKERS  # keep-alive connections kept open per host
 REQUEST_TIMEOUT = 30     # seconds per HTTP request
+ICAL_CHUNK_SIZE = 64 * 1024  # bytes read per chunk when streaming the feed
+BATCH_SIZE = 500         # events per upsert chunk
+UPSERT_WORKERS = 2       # chunks written concurrently
+UPSERT_RETRIES = 2       # extra attempts per chunk before the run fails
+UPSERT_RETRY_DELAY = 1.0 # seconds, doubled after each failed attempt
+MAX_DEAD_LETTERS = 50    # rejected rows quarantined before the run fails
+DESCRIPTION_MAX_CHARS = 10_000  # longer cleaned descriptions are truncated
 MAX_FAILURES = 3         # consecutive failures before kill switch activates
+SAFETY_THRESHOLD = 50    # stored events that may not vanish in one run unchecked
+# Reconciliation only judges events ending this long after the UTC date sent
+# as endsAfter: the API may read that date in local (Eastern) time.
+RECONCILE_MARGIN_HOURS = 24
+
+# Adaptive API rate limiting (requests per second, shared by all workers).
+INITIAL_REQUESTS_PER_SECOND = 1.0   # used until state.json remembers a rate
+MIN_REQUESTS_PER_SECOND = 0.2
+MAX_REQUESTS_PER_SECOND = 5.0
+RATE_STEP = 0.1          # added after each fast 2xx response
+FAST_RESPONSE_SECS = 1.0 # responses slower than this don't speed us up
+RETRY_STATUSES = (429, 503)
+MAX_PAGE_RETRIES = 5     # per page, before giving up on the API path
+MAX_RETRY_AFTER = 120.0  # longer Retry-After values abandon the API path
+
+# Incremental fetching (opt-in via run(incremental=True) until the filter is
+# verified against the live API): between full sweeps only events changed
+# since the last successful API run are requested.  Full sweeps still run
+# every FULL_SWEEP_HOURS so the complete catalogue is re-read regularly.
+INCREMENTAL_PARAM = "updatedAfter"  # discovery search filter on modification time
+FULL_SWEEP_HOURS = 24
+WATERMARK_OVERLAP_SECS = 600  # re-request a margin to absorb clock skew
 
 STATE_FILE = Path(__file__).parent.parent / "state.json"
+CAMPUS_CACHE_FILE = Path(__file__).parent.parent / "campus_cache.json"
+DEAD_LETTER_FILE = Path(__file__).parent.parent / "dead_letter.jsonl"
+CAMPUS_CACHE_SIZE = 4096  # distinct location strings remembered
 
 # ---------------------------------------------------------------------------
 # Campus inference
@@ -87,33 +139,150 @@ OFF_CAMPUS_KEYWORDS = [
 ]
 
 
-def infer_campus(location: str | None) -> str:
-    if not location:
-        return "Unknown"
-    loc_lower = location.lower()
+class _KeywordMatcher:
+    """
+    Aho-Corasick automaton over lower-cased keywords, built once at import.
 
-    # Explicit TBD → Unknown (not Off-Campus)
-    for pat in TBD_PATTERNS:
-        if loc_lower.startswith(pat):
-            return "Unknown"
+    Keywords are added in precedence order, each with a label.  ``match``
+    makes one left-to-right pass over the text and returns the label of the
+    highest-precedence keyword found anywhere in it — the same answer as
+    trying each keyword in turn with ``in``.  Failure links are compiled
+    into a full transition table so matching is one dict lookup per char.
+    """
 
-    # Online check
-    for kw in ONLINE_KEYWORDS:
-        if kw in loc_lower:
-            return "Online"
+    _NONE = 1 << 30
+
+    def __init__(self, keywords: Iterable[tuple[str, str]]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        best: list[int] = [self._NONE]   # lowest keyword rank ending here
+        self._labels: list[str] = []
+
+        for rank, (keyword, label) in enumerate(keywords):
+            self._labels.append(label)
+            node = 0
+            for ch in keyword.lower():
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    best.append(self._NONE)
+                node = nxt
+            best[node] = min(best[node], rank)
+
+        # Breadth-first, so a node's failure target is always finished first:
+        # inherit its transitions and fold its matches into our best rank.
+        fail = [0] * len(goto)
+        delta: list[dict[str, int]] = [dict(goto[0])] + [{}] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            best[node] = min(best[node], best[fail[node]])
+            for ch, child in goto[node].items():
+                fail[child] = delta[fail[node]].get(ch, 0) if node else 0
+                queue.append(child)
+
+        self._delta = delta
+        self._best = best
+
+    def match(self, text: str) -> str | None:
+        delta, best = self._delta, self._best
+        found = self._NONE
+        node = 0
+        for ch in text:
+            node = delta[node].get(ch, 0)
+            if best[node] < found:
+                found = best[node]
+        return self._labels[found] if found != self._NONE else None
+
+
+# Precedence after the TBD prefix check: Online → campus keywords in table
+# order → off-campus venues.
+_CAMPUS_MATCHER = _KeywordMatcher(
+    [(kw, "Online") for kw in ONLINE_KEYWORDS]
+    + [(kw, campus) for campus, keywords in CAMPUS_KEYWORDS.items() for kw in keywords]
+    + [(kw, "Off-Campus") for kw in OFF_CAMPUS_KEYWORDS]
+)
+_TBD_PREFIXES = tuple(TBD_PATTERNS)
+
+# Changes whenever any keyword table (or its order) changes, invalidating
+# persisted cache entries computed from the old tables.
+_KEYWORDS_FINGERPRINT = hashlib.sha256(json.dumps(
+    [TBD_PATTERNS, ONLINE_KEYWORDS, CAMPUS_KEYWORDS, OFF_CAMPUS_KEYWORDS]
+).encode()).hexdigest()[:16]
+
+
+class _CampusCache:
+    """Bounded LRU of lower-cased location → campus, persistable to disk."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            campus = self._entries.get(key)
+            if campus is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return campus
+
+    def put(self, key: str, campus: str) -> None:
+        with self._lock:
+            self._entries[key] = campus
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def load(self, path: Path) -> None:
+        """Reset counters and warm from ``path`` if its tables still match."""
+        self.hits = self.misses = 0
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("fingerprint") != _KEYWORDS_FINGERPRINT:
+            logger.info("Campus keyword tables changed — discarding %s.", path.name)
+            return
+        for key, campus in (data.get("entries") or {}).items():
+            self.put(key, campus)
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            entries = dict(self._entries)
+        try:
+            path.write_text(json.dumps(
+                {"fingerprint": _KEYWORDS_FINGERPRINT, "entries": entries}))
+        except OSError as exc:
+            logger.warning("Could not save campus cache: %s", exc)
+
+
+_CAMPUS_CACHE = _CampusCache(CAMPUS_CACHE_SIZE)
 
-    # Rutgers campus keywords
-    for campus, keywords in CAMPUS_KEYWORDS.items():
-        for kw in keywords:
-            if kw.lower() in loc_lower:
-                return campus
 
-    # Off-campus fallback
-    for kw in OFF_CAMPUS_KEYWORDS:
-        if kw.lower() in loc_lower:
-            return "Off-Campus"
+def _match_campus(loc_lower: str) -> str:
+    # Explicit TBD → Unknown (not Off-Campus)
+    if loc_lower.startswith(_TBD_PREFIXES):
+        return "Unknown"
+    return _CAMPUS_MATCHER.match(loc_lower) or "Unknown"
 
-    return "Unknown"
+
+def infer_campus(location: str | None) -> str:
+    if not location:
+        return "Unknown"
+    # Matching is case-insensitive, so the lower-cased string is the key.
+    loc_lower = location.lower()
+    campus = _CAMPUS_CACHE.get(loc_lower)
+    if campus is None:
+        campus = _match_campus(loc_lower)
+        _CAMPUS_CACHE.put(loc_lower, campus)
+    return campus
 
 
 # ---------------------------------------------------------------------------
@@ -129,15 +298,166 @@ def make_event_id(title: str, start_time: str, source: str) -> str:
 # HTML stripping
 # ---------------------------------------------------------------------------
 
-_HTML_TAG_RE = re.compile(r"<[^>]+>")
-_WHITESPACE_RE = re.compile(r"\s+")
+# Tags are tokenized by one re.split whose capture is the tag name; names
+# are then mapped to a break or a space with map(dict.get), and entities
+# to characters with map() over an lru_cache, so no Python code runs per
+# tag or entity.  Whitespace is collapsed with str.split.
+_LINE_MARK = "\x00"
+_PARAGRAPH_MARK = "\x01"
+_LINE_TAGS = ("br", "li", "tr", "dt", "dd")
+_PARAGRAPH_TAGS = (
+    "p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "dl", "table",
+    "blockquote", "pre", "hr", "section", "article", "header", "footer",
+)
+# Other mixed-case spellings are rare enough to be treated as inline tags.
+_TAG_BREAKS = {
+    variant: mark
+    for names, mark in ((_LINE_TAGS, _LINE_MARK), (_PARAGRAPH_TAGS, _PARAGRAPH_MARK))
+    for name in names
+    for variant in (name, name.upper(), name.capitalize())
+}
+# [^>]* scans much faster than [^<>]*, but swallows a stray "<" up to the
+# next tag's ">", and a "<" with no ">" after it scans to the end of the
+# text, which turns quadratic when there are many.  Text with unbalanced
+# brackets, or a "<" after the last ">", gets the variant that stops at
+# the next "<".
+_HTML_TAG_SPLIT_RE = re.compile(r"</?([a-zA-Z][a-zA-Z0-9]*)[^>]*>")
+_HTML_TAG_SPLIT_STRICT_RE = re.compile(r"</?([a-zA-Z][a-zA-Z0-9]*)[^<>]*>")
+# Comments, <!DOCTYPE>/<?xml?> and <script>/<style> elements are dropped
+# whole by _drop_hidden_html; their openers are found with this.
+_HTML_HIDDEN_OPEN_RE = re.compile(
+    r"<(?:(!--)|[!?][^<>]*>|(script|style)\b[^<>]*>)", re.IGNORECASE)
+_HIDDEN_TAG_NAMES = frozenset(
+    variant for name in ("script", "style")
+    for variant in (name, name.upper(), name.capitalize()))
+# Entity-dense text is cheaper to decode with one str.replace per common
+# entity than one lookup per match.  &amp; is left for last so "&amp;lt;"
+# stays "&lt;".
+_DENSE_ENTITY_SPACING = 32
+_COMMON_ENTITIES = (
+    ("&nbsp;", "\xa0"), ("&#160;", "\xa0"), ("&lt;", "<"), ("&gt;", ">"),
+    ("&quot;", '"'), ("&#39;", "'"), ("&#8217;", "\u2019"), ("&rsquo;", "\u2019"),
+    ("&lsquo;", "\u2018"), ("&ldquo;", "\u201c"), ("&rdquo;", "\u201d"),
+    ("&mdash;", "\u2014"), ("&ndash;", "\u2013"), ("&hellip;", "\u2026"),
+)
+_ENTITY_SPLIT_RE = re.compile(
+    r"(&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[a-zA-Z][a-zA-Z0-9]{1,31});)")
+_OTHER_ENTITY_RE = re.compile(
+    r"&(?!amp;)(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[a-zA-Z][a-zA-Z0-9]{1,31});")
+_decode_entity = lru_cache(maxsize=2048)(html.unescape)
+_TRAILING_WORD_RE = re.compile(r"\S+$")
+
+
+def _drop_hidden_html(text: str) -> str:
+    """
+    Replace comments, declarations and <script>/<style> elements with a
+    space.  Each closer is searched for with str.find and the result is
+    remembered, so unclosed openers cannot make the scan quadratic.
+    """
+    lower = text.lower()
+    found: dict[str, int] = {}
 
+    def find(needle: str, start: int) -> int:
+        at = found.get(needle)
+        if at is None or 0 <= at < start:
+            at = found[needle] = lower.find(needle, start)
+        return at
 
-def strip_html(text: str | None) -> str | None:
+    out: list[str] = []
+    pos = 0
+    while True:
+        match = _HTML_HIDDEN_OPEN_RE.search(text, pos)
+        if match is None:
+            break
+        comment, element = match.group(1, 2)
+        end = match.end()
+        if comment:
+            close = find("-->", end)
+            if close >= 0:
+                end = close + 3
+            else:
+                # Unclosed: treat it like <!...>, up to the next ">".
+                gt, lt = find(">", end), find("<", end)
+                if gt < 0 or 0 <= lt < gt:
+                    pos = end
+                    continue
+                end = gt + 1
+        elif element:
+            close = find("</" + element.lower(), end)
+            if close < 0:
+                # A lone opening tag is stripped like any other tag.
+                pos = end
+                continue
+            gt = find(">", close)
+            end = len(text) if gt < 0 else gt + 1
+        out.append(text[pos:match.start()])
+        out.append(" ")
+        pos = end
+    if not out:
+        return text
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _decode_entities(text: str) -> str:
+    if text.count("&") * _DENSE_ENTITY_SPACING > len(text):
+        for entity, char in _COMMON_ENTITIES:
+            if entity in text:
+                text = text.replace(entity, char)
+        if not _OTHER_ENTITY_RE.search(text):
+            return text.replace("&amp;", "&")
+    parts = _ENTITY_SPLIT_RE.split(text)
+    parts[1::2] = map(_decode_entity, parts[1::2])
+    return "".join(parts)
+
+
+def strip_html(text: str | None,
+               max_chars: int | None = DESCRIPTION_MAX_CHARS) -> str | None:
+    """
+    Convert an HTML description to plain text: tags stripped, entities
+    decoded, <script>/<style> bodies dropped, whitespace collapsed, and
+    block elements kept as line / paragraph breaks.  Output longer than
+    ``max_chars`` is cut at a word boundary and ends with "…".
+    """
     if not text:
         return None
-    cleaned = _HTML_TAG_RE.sub(" ", text)
-    cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip()
+    # Placeholder characters in the input itself are just whitespace.
+    if _LINE_MARK in text or _PARAGRAPH_MARK in text:
+        text = text.replace(_LINE_MARK, " ").replace(_PARAGRAPH_MARK, " ")
+    if "<" in text:
+        if "<!" in text or "<?" in text:
+            text = _drop_hidden_html(text)
+        balanced = (text.count("<") == text.count(">")
+                    and text.rfind("<") < text.rfind(">"))
+        tag_re = _HTML_TAG_SPLIT_RE if balanced else _HTML_TAG_SPLIT_STRICT_RE
+        parts = tag_re.split(text)
+        if not _HIDDEN_TAG_NAMES.isdisjoint(parts[1::2]):
+            parts = tag_re.split(_drop_hidden_html(text))
+        parts[1::2] = map(_TAG_BREAKS.get, parts[1::2], repeat(" "))
+        text = "".join(parts)
+    # Decoded after tags are gone, so "&lt;b&gt;" stays visible text.
+    if "&" in text:
+        text = _decode_entities(text)
+    cleaned = " ".join(text.split())
+    # Empty paragraphs and lines are runs of adjacent breaks; dropping
+    # them merges each run into one break of its strongest kind.
+    if _PARAGRAPH_MARK in cleaned:
+        paragraphs = cleaned.split(_PARAGRAPH_MARK)
+        cleaned = "\n\n".join(filter(None, map(str.strip, paragraphs,
+                                                repeat(" " + _LINE_MARK))))
+    if _LINE_MARK in cleaned:
+        cleaned = (cleaned.strip(" " + _LINE_MARK)
+                   .replace(" " + _LINE_MARK, _LINE_MARK)
+                   .replace(_LINE_MARK + " ", _LINE_MARK))
+        while _LINE_MARK * 2 in cleaned:
+            cleaned = cleaned.replace(_LINE_MARK * 2, _LINE_MARK)
+        cleaned = cleaned.replace(_LINE_MARK, "\n")
+    if max_chars and len(cleaned) > max_chars:
+        cut = cleaned[:max_chars]
+        if not cleaned[max_chars].isspace():
+            # Drop the partial last word, unless it is the only one.
+            cut = _TRAILING_WORD_RE.sub("", cut) or cut
+        cleaned = cut.rstrip() + "…"
     return cleaned or None
 
 
@@ -174,8 +494,9 @@ def _record_failure(state: dict) -> dict:
     return state
 
 
-def _record_success(state: dict) -> dict:
+def _record_success(state: dict, updates: dict | None = None) -> dict:
     s = state.setdefault(SOURCE, {})
+    s.update(updates or {})
     s["consecutive_failures"] = 0
     s["kill_switch"] = False
     s["last_success"] = datetime.now(timezone.utc).isoformat()
@@ -184,19 +505,87 @@ def _record_success(state: dict) -> dict:
     return state
 
 
+# ---------------------------------------------------------------------------
+# Event record
+# ---------------------------------------------------------------------------
+
+class Event(NamedTuple):
+    """
+    One normalized event, in ``events`` table column order.
+
+    A tuple costs a fraction of a 12-key dict per event; records are only
+    turned into dicts (``_asdict()``) at the sink boundary.
+    ``last_seen`` must stay the last field (see content_fingerprint).
+    """
+
+    event_id: str
+    source: str
+    title: str
+    description: str | None
+    start_time: str
+    end_time: str | None
+    location: str | None
+    campus: str
+    organization: str | None
+    category: str | None
+    source_url: str
+    last_seen: str
+
+
+def content_fingerprint(event: Event) -> str:
+    """Hash of every normalized field except ``last_seen``."""
+    raw = "\x1f".join("\x00" if v is None else v for v in event[:-1])
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def _intern(value: str | None) -> str | None:
+    """Share one copy of low-cardinality strings across all events."""
+    return sys.intern(value) if value is not None else None
+
+
 # ---------------------------------------------------------------------------
 # Normalisation helpers
 # ---------------------------------------------------------------------------
 
+# How often each _to_utc_iso tier handled a value; reset at the start of run().
+_TIMESTAMP_STATS = {"iso": 0, "dateutil": 0, "native": 0, "failed": 0}
+
+
+@lru_cache(maxsize=1024)
+def _parse_with_dateutil(value: str) -> datetime | None:
+    try:
+        return dateutil_parser.parse(value)
+    except Exception:
+        return None
+
+
+def _parse_timestamp(value: str) -> datetime | None:
+    """
+    Parse a timestamp string: strict ISO-8601 via ``fromisoformat`` first
+    (what Campus Labs returns), then a cached dateutil fallback for
+    anything else.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+        _TIMESTAMP_STATS["iso"] += 1
+        return parsed
+    except ValueError:
+        pass
+    parsed = _parse_with_dateutil(value)
+    _TIMESTAMP_STATS["dateutil" if parsed else "failed"] += 1
+    return parsed
+
+
 def _to_utc_iso(dt_value: Any) -> str | None:
     """Return an ISO-8601 UTC string from a datetime, date, or string."""
     if dt_value is None:
         return None
     if isinstance(dt_value, str):
-        try:
-            dt_value = dateutil_parser.parse(dt_value)
-        except Exception:
+        dt_value = _parse_timestamp(dt_value)
+        if dt_value is None:
             return None
+    else:
+        _TIMESTAMP_STATS["native"] += 1
     # icalendar returns date or datetime
     if not isinstance(dt_value, datetime):
         # plain date → midnight UTC
@@ -207,7 +596,7 @@ def _to_utc_iso(dt_value: Any) -> str | None:
     return dt_value.astimezone(timezone.utc).isoformat()
 
 
-def _normalize_api_event(raw: dict) -> dict | None:
+def _normalize_api_event(raw: dict) -> Event | None:
     """Map a Campus Labs API event dict to our schema."""
     title = (raw.get("name") or "").strip()
     if not title:
@@ -245,23 +634,23 @@ def _normalize_api_event(raw: dict) -> dict | None:
 
     event_id = make_event_id(title, start_iso, SOURCE)
 
-    return {
-        "event_id":    event_id,
-        "source":      SOURCE,
-        "title":       title,
-        "description": strip_html(raw.get("description")),
-        "start_time":  start_iso,
-        "end_time":    end_iso,
-        "location":    location,
-        "campus":      infer_campus(location),
-        "organization": org,
-        "category":    category,
-        "source_url":  source_url,
-        "last_seen":   datetime.now(timezone.utc).isoformat(),
-    }
+    return Event(
+        event_id=event_id,
+        source=SOURCE,
+        title=title,
+        description=strip_html(raw.get("description")),
+        start_time=start_iso,
+        end_time=end_iso,
+        location=location,
+        campus=_intern(infer_campus(location)),
+        organization=_intern(org),
+        category=_intern(category),
+        source_url=source_url,
+        last_seen=datetime.now(timezone.utc).isoformat(),
+    )
 
 
-def _normalize_ical_event(component: Any) -> dict | None:
+def _normalize_ical_event(component: Any) -> Event | None:
     """Map an icalendar VEVENT component to our schema."""
     title = str(component.get("SUMMARY") or "").strip()
     if not title:
@@ -283,160 +672,687 @@ def _normalize_ical_event(component: Any) -> dict | None:
     # consistency with the API path.
     event_id = make_event_id(title, start_iso, SOURCE)
 
-    return {
-        "event_id":    event_id,
-        "source":      SOURCE,
-        "title":       title,
-        "description": description,
-        "start_time":  start_iso,
-        "end_time":    end_iso,
-        "location":    location,
-        "campus":      infer_campus(location),
-        "organization": None,   # iCal feed doesn't carry org info
-        "category":    None,
-        "source_url":  url,
-        "last_seen":   datetime.now(timezone.utc).isoformat(),
-    }
+    return Event(
+        event_id=event_id,
+        source=SOURCE,
+        title=title,
+        description=description,
+        start_time=start_iso,
+        end_time=end_iso,
+        location=location,
+        campus=_intern(infer_campus(location)),
+        organization=None,   # iCal feed doesn't carry org info
+        category=None,
+        source_url=url,
+        last_seen=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+# ---------------------------------------------------------------------------
+# HTTP session
+# ---------------------------------------------------------------------------
+
+def _build_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """
+    Return a keep-alive session shared by the API and iCal fetchers.
+
+    ``pool_block`` makes extra worker threads wait for a pooled connection
+    instead of opening throwaway ones beyond ``pool_size``.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size,
+                          pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT,
+                            "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def _connection_stats(session: requests.Session) -> dict:
+    """Return {"opened": int, "reused": int} across the session's pools."""
+    opened = requests_made = 0
+    adapters = {id(a): a for a in session.adapters.values()}.values()
+    for adapter in adapters:
+        pools = getattr(adapter, "poolmanager", None)
+        if pools is None:
+            continue
+        for key in pools.pools.keys():
+            pool = pools.pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_made += pool.num_requests
+    return {"opened": opened, "reused": max(0, requests_made - opened)}
 
 
 # ---------------------------------------------------------------------------
 # Fetching logic
 # ---------------------------------------------------------------------------
 
-def _fetch_via_api() -> list[dict]:
+class _RateLimiter:
     """
-    Fetch all approved events from the Campus Labs REST API,
-    paginating with PAGE_SIZE / PAGE_DELAY.
-    Raises requests.HTTPError on 4xx/5xx so the caller can fall back.
+    Adaptive token bucket shared by every API worker thread.
+
+    The rate creeps up by RATE_STEP after each fast 2xx and halves on
+    429/503, at which point all workers also pause for ``Retry-After``
+    (at most MAX_RETRY_AFTER — longer waits abandon the page anyway).
+    ``rate`` is read back after the run and persisted in state.json.
     """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = min(MAX_REQUESTS_PER_SECOND, max(MIN_REQUESTS_PER_SECOND, rate))
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: threading.Event | None = None) -> None:
+        """Wait for a token; raise _FetchStopped once ``stop`` is set."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    elapsed = max(0.0, now - self._refilled)
+                    self._tokens = min(1.0, self._tokens + elapsed * self.rate)
+                    self._refilled = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    delay = (1.0 - self._tokens) / self.rate
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                raise _FetchStopped()
+
+    def record(self, status: int, elapsed: float,
+               retry_after: float | None = None) -> None:
+        with self._lock:
+            if status in RETRY_STATUSES:
+                self.rate = max(MIN_REQUESTS_PER_SECOND, self.rate / 2)
+                pause = (min(retry_after, MAX_RETRY_AFTER) if retry_after is not None
+                         else 1.0 / self.rate)
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                self._tokens = 0.0
+                self._refilled = self._paused_until
+            elif 200 <= status < 300 and elapsed < FAST_RESPONSE_SECS:
+                self.rate = min(MAX_REQUESTS_PER_SECOND, self.rate + RATE_STEP)
+
+
+class _FetchStopped(Exception):
+    """The consumer stopped reading; queued page fetches give up."""
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Return Retry-After as seconds (delta-seconds or HTTP-date form)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _page_items(data: Any) -> tuple[list[dict], int]:
+    """Return (raw events, totalItems) from one API response body."""
+    # Campus Labs API wraps results under "value"; fallback to list root.
+    if isinstance(data, list):
+        return data, len(data)
+    raw_list: list[dict] = data.get("value") or []
+    total: int = data.get("totalItems") or data.get("@odata.count") or len(raw_list)
+    return raw_list, total
+
+
+def _fetch_api_page(session: requests.Session, params: dict, skip: int,
+                    limiter: _RateLimiter, stop: threading.Event | None = None,
+                    ) -> tuple[list[dict], int, int]:
+    """
+    Fetch one page, retrying it on 429/503 as the limiter backs off.
+    Returns (raw events, totalItems, response body bytes).  Raises
+    _FetchStopped if ``stop`` is set while waiting on the limiter.
+    """
+    page = skip // PAGE_SIZE
+    for attempt in range(MAX_PAGE_RETRIES + 1):
+        limiter.acquire(stop)
+        logger.info("API page %d (skip=%d) …", page, skip)
+        started = time.monotonic()
+        resp = session.get(API_URL, params={**params, "skip": skip},
+                           headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+        limiter.record(resp.status_code, time.monotonic() - started, retry_after)
+
+        if (resp.status_code in RETRY_STATUSES and attempt < MAX_PAGE_RETRIES
+                and (retry_after or 0.0) <= MAX_RETRY_AFTER):
+            logger.warning(
+                "API page %d returned %d — retrying (rate now %.2f req/s).",
+                page, resp.status_code, limiter.rate,
+            )
+            continue
+        resp.raise_for_status()
+        return (*_page_items(resp.json()), len(resp.content))
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _iter_api_events(session: requests.Session, limiter: _RateLimiter,
+                     since: str | None = None, stats: dict | None = None,
+                     workers: int = API_WORKERS) -> Iterator[Event]:
+    """
+    Yield normalized, approved events from the Campus Labs REST API.
+
+    With ``since`` set, only events modified after that ISO timestamp are
+    requested (see INCREMENTAL_PARAM); otherwise every upcoming event is.
+    If the API answers an incremental request with a 4xx (other than 429),
+    the filter is dropped and the page refetched as a full sweep.
+    ``stats["incremental"]`` says which was done, ``stats["ends_after"]``
+    holds the endsAfter date sent, and response bytes downloaded are
+    accumulated in ``stats["bytes"]``.
+
+    Page 0 is read first to learn ``totalItems``; the remaining ``skip``
+    offsets are then fetched by up to ``workers`` threads sharing ``limiter``,
+    at most ``2 * workers`` pages ahead of the consumer.  Pages are yielded
+    in ``skip`` order, so events reach the caller in the API's ``endsOn``
+    order.
+    Raises requests.HTTPError on 4xx/5xx (or once 429/503 retries are
+    exhausted) so the caller can fall back.
+    """
+    stats = stats if stats is not None else {}
     today = datetime.now(timezone.utc).date().isoformat()
+    stats["ends_after"] = today
     params = {
         "endsAfter":        today,
         "orderByField":     "endsOn",
         "orderByDirection": "ascending",
         "status":           "Approved",
         "take":             PAGE_SIZE,
-        "skip":             0,
     }
+    if since:
+        params[INCREMENTAL_PARAM] = since
+    stats["incremental"] = bool(since)
 
-    events: list[dict] = []
-    page = 0
-
-    while True:
-        params["skip"] = page * PAGE_SIZE
-        if page > 0:
-            time.sleep(PAGE_DELAY)
-
-        logger.info("API page %d (skip=%d) …", page, params["skip"])
-        resp = requests.get(API_URL, params=params, headers=HEADERS,
-                            timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
+    try:
+        first_page, total, stats["bytes"] = _fetch_api_page(session, params, 0, limiter)
+    except requests.HTTPError as exc:
+        status = exc.response.status_code if exc.response is not None else 0
+        if not since or not 400 <= status < 500 or status == 429:
+            raise
+        logger.warning("API rejected %s (%d) — retrying as a full sweep.",
+                       INCREMENTAL_PARAM, status)
+        del params[INCREMENTAL_PARAM]
+        stats["incremental"] = False
+        first_page, total, stats["bytes"] = _fetch_api_page(session, params, 0, limiter)
+    yield from _normalize_api_page(first_page)
+    if not first_page:
+        return
+
+    workers = max(1, workers)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    stop = threading.Event()
+    pending: deque[Future] = deque()
+    next_skip = PAGE_SIZE
+    try:
+        # totalItems can grow while we paginate, so it is re-read per page.
+        while pending or next_skip < total:
+            while next_skip < total and len(pending) < 2 * workers:
+                pending.append(pool.submit(_fetch_api_page, session, params,
+                                           next_skip, limiter, stop))
+                next_skip += PAGE_SIZE
+            raw_list, page_total, page_bytes = pending.popleft().result()
+            stats["bytes"] += page_bytes
+            total = max(total, page_total)
+            yield from _normalize_api_page(raw_list)
+    finally:
+        # Workers waiting out a limiter pause would otherwise hold up the
+        # shutdown (and a failed run's fallback) for the whole pause.
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _normalize_api_page(raw_list: list[dict]) -> Iterator[Event]:
+    for raw in raw_list:
+        normalized = _normalize_api_event(raw)
+        if normalized:
+            yield normalized
+
+
+def _incremental_since(source_state: dict, now: datetime) -> str | None:
+    """Return the timestamp to fetch changes from, or None if a full sweep is due."""
+    watermark = source_state.get("watermark")
+    last_full = source_state.get("last_full_sweep")
+    if not watermark or not last_full:
+        return None
+    try:
+        watermark_dt = datetime.fromisoformat(watermark)
+        last_full_dt = datetime.fromisoformat(last_full)
+    except ValueError:
+        return None
+    if now - last_full_dt >= timedelta(hours=FULL_SWEEP_HOURS):
+        return None
+    return (watermark_dt - timedelta(seconds=WATERMARK_OVERLAP_SECS)).isoformat()
 
-        data = resp.json()
-        # Campus Labs API wraps results under "value"; fallback to list root.
-        raw_list: list[dict] = data.get("value") or (data if isinstance(data, list) else [])
-        total: int = data.get("totalItems") or data.get("@odata.count") or len(raw_list)
 
-        for raw in raw_list:
-            normalized = _normalize_api_event(raw)
-            if normalized:
-                events.append(normalized)
+def _iter_ical_events(session: requests.Session, validators: dict | None = None,
+                      stats: dict | None = None) -> Iterator[Event]:
+    """
+    Yield normalized events from the public iCal feed (the fallback).
 
-        page += 1
-        if len(events) >= total or not raw_list:
-            break
+    ``validators`` are the ETag / Last-Modified values saved from the last
+    successful run; they are sent as a conditional GET.  The response's
+    validators are left in ``stats["validators"]``; on 304 Not Modified
+    nothing is yielded and ``stats["not_modified"]`` is set.
+    """
+    stats = stats if stats is not None else {}
+    validators = validators or {}
+    headers = {**HEADERS, "Accept": "text/calendar"}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
 
-    return events
+    logger.info("Fetching iCal feed from %s …", ICAL_URL)
+    with session.get(ICAL_URL, headers=headers, timeout=REQUEST_TIMEOUT,
+                     stream=True) as resp:
+        if resp.status_code == 304:
+            logger.info("iCal feed not modified since last run.")
+            stats["not_modified"] = True
+            stats["validators"] = validators
+            return
+        resp.raise_for_status()
 
+        stats["validators"] = {
+            "etag":          resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
 
-def _fetch_via_ical() -> list[dict]:
-    """Fetch and parse the public iCal feed as a fallback."""
-    logger.info("Fetching iCal feed from %s …", ICAL_URL)
-    resp = requests.get(ICAL_URL, headers={**HEADERS, "Accept": "text/calendar"},
-                        timeout=REQUEST_TIMEOUT)
-    resp.raise_for_status()
-
-    cal = Calendar.from_ical(resp.content)
-    events: list[dict] = []
-    for component in cal.walk():
-        if component.name == "VEVENT":
+        lines = resp.iter_lines(chunk_size=ICAL_CHUNK_SIZE)
+        for component in _iter_ical_vevents(lines):
             normalized = _normalize_ical_event(component)
             if normalized:
-                events.append(normalized)
+                yield normalized
 
-    return events
+
+def _unfold_ical_lines(lines: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Join RFC 5545 folded lines: a line starting with a space or tab
+    continues the previous one.  Works on bytes so a fold that splits a
+    multi-byte UTF-8 character is reassembled before decoding.
+    """
+    current: bytes | None = None
+    for line in lines:
+        # Blank lines are not valid iCal, but iter_lines() yields one when a
+        # CRLF straddles two chunks — skip them so folds stay attached.
+        if not line:
+            continue
+        if line[:1] in (b" ", b"\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _iter_ical_vevents(lines: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Yield one parsed VEVENT at a time from raw feed lines, so memory stays
+    bounded by a single event rather than the whole calendar.  TZIDs are
+    resolved by name, as Campus Labs only uses IANA zone identifiers.
+    """
+    block: list[bytes] | None = None
+    for line in _unfold_ical_lines(lines):
+        marker = line.upper()
+        if block is None:
+            if marker == b"BEGIN:VEVENT":
+                block = [line]
+            continue
+        block.append(line)
+        if marker == b"END:VEVENT":
+            try:
+                yield ICalEvent.from_ical(b"\r\n".join(block) + b"\r\n")
+            except ValueError as exc:
+                logger.warning("Skipping unparsable VEVENT: %s", exc)
+            block = None
 
 
 # ---------------------------------------------------------------------------
-# Supabase upsert
+# Upsert
 # ---------------------------------------------------------------------------
 
-def _get_stored_count(client: Client) -> int:
-    result = (
-        client.table("events")
-        .select("id", count="exact")
-        .eq("source", SOURCE)
-        .execute()
-    )
-    return result.count or 0
+def _upsert_events(sink: EventSink, events: list[Event],
+                   stored: dict[str, str | None]) -> tuple[int, int, int]:
+    """
+    Sync one batch of (already deduplicated) events into ``sink``.
+
+    Events are classified against the ``stored`` fingerprints: new and
+    changed rows are written in full, while unchanged rows are passed by id
+    so only their ``last_seen`` is bumped.
+    Returns (inserted, changed, unchanged) counts as the sink reports them.
+    """
+    if not events:
+        return 0, 0, 0
+
+    rows: list[dict] = []
+    unchanged_ids: list[str] = []
+    for event in events:
+        fingerprint = content_fingerprint(event)
+        if stored.get(event.event_id) == fingerprint:
+            unchanged_ids.append(event.event_id)
+            continue
+        rows.append({**event._asdict(), "content_hash": fingerprint})
+
+    return sink.write(rows, unchanged_ids)
+
+
+class _UpsertError(Exception):
+    """A sink write failed; raised by _Pipeline so callers can tell it
+    apart from fetch errors, which trigger the iCal fallback instead."""
 
 
-def _upsert_events(client: Client, events: list[dict]) -> tuple[int, int]:
+class _Pipeline:
     """
-    Upsert events into Supabase.
-    Returns (inserted, updated) counts (approximate — Supabase doesn't
-    distinguish them cleanly, so we track by checking existing event_ids).
+    Streaming dedupe → batch → upsert stage fed by the fetch generators.
+
+    Events are deduplicated by event_id as they arrive — the API can return
+    the same event on multiple pages, which Postgres rejects within one
+    upsert — and flushed in ``batch_size`` chunks to a pool of ``workers``
+    writer threads, so fetching continues while chunks are written.  At
+    most ``workers`` chunks are in flight, which bounds memory, and each
+    chunk is retried UPSERT_RETRIES times before the run is failed.
+
+    A chunk the sink rejects (RowsRejected — a constraint or type error,
+    not a network failure) is bisected until the offending rows are
+    isolated; the rest is written and each bad row is appended to
+    ``dead_letter_file`` with its error.  More than MAX_DEAD_LETTERS
+    rejected rows means the problem is not a stray row, and the run fails.
     """
-    if not events:
-        return 0, 0
-
-    # Deduplicate by event_id — the API can return the same event on multiple
-    # pages, which causes Postgres to reject the batch upsert.
-    seen: set[str] = set()
-    deduped: list[dict] = []
-    for e in events:
-        if e["event_id"] not in seen:
-            seen.add(e["event_id"])
-            deduped.append(e)
-    if len(deduped) < len(events):
-        logger.info("Deduplicated %d → %d events.", len(events), len(deduped))
-    events = deduped
-
-    # Fetch existing event_ids for this batch so we can classify ins vs upd.
-    ids = [e["event_id"] for e in events]
-    existing_result = (
-        client.table("events")
-        .select("event_id")
-        .in_("event_id", ids)
-        .execute()
-    )
-    existing_ids = {row["event_id"] for row in (existing_result.data or [])}
 
-    inserted = sum(1 for e in events if e["event_id"] not in existing_ids)
-    updated = len(events) - inserted
+    def __init__(self, sink: EventSink, batch_size: int = BATCH_SIZE,
+                 workers: int = UPSERT_WORKERS,
+                 dead_letter_file: Path | None = DEAD_LETTER_FILE) -> None:
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.dead_letter_file = dead_letter_file
+        self.fetched = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.retries = 0
+        self.quarantined = 0
+        self._dead_letter_lock = threading.Lock()
+        self.first_write_ms: int | None = None
+        self._latencies_ms: list[int] = []
+        self._seen: set[str] = set()
+        self._batch: list[Event] = []
+        self._started = time.monotonic()
+        self._writer = ThreadPoolExecutor(max_workers=self.workers)
+        self._in_flight: deque[Future] = deque()
+        # Queued first, so it is loaded while the first page is fetched;
+        # writer threads wait on it before classifying their chunk.
+        self._stored = self._writer.submit(self._with_retries, sink.fingerprints, SOURCE)
+
+    def feed(self, events: Iterable[Event]) -> None:
+        """Consume ``events``; fetch errors propagate unchanged."""
+        for event in events:
+            self.fetched += 1
+            if event.event_id in self._seen:
+                continue
+            self._seen.add(event.event_id)
+            self._batch.append(event)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def finish(self) -> None:
+        """Write any partial chunk and wait for outstanding writes."""
+        self._flush()
+        while self._in_flight:
+            self._collect()
+        if len(self._seen) < self.fetched:
+            logger.info("Deduplicated %d → %d events.", self.fetched, len(self._seen))
+
+    def close(self) -> None:
+        self._writer.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def event_ids(self) -> list[str]:
+        """Distinct event_ids fed so far."""
+        return list(self._seen)
+
+    def metrics(self) -> dict:
+        """Chunk count, retries and p50 / max chunk latency."""
+        latencies = sorted(self._latencies_ms)
+        return {
+            "chunks":  len(latencies),
+            "retries": self.retries,
+            "p50_ms":  latencies[len(latencies) // 2] if latencies else None,
+            "max_ms":  latencies[-1] if latencies else None,
+        }
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        while len(self._in_flight) >= self.workers:
+            self._collect()
+        self._in_flight.append(self._writer.submit(self._write, self._batch))
+        self._batch = []
+
+    def _with_retries(self, fn, *args):
+        """Call ``fn``; return (result, attempts, finished_at)."""
+        for attempt in range(UPSERT_RETRIES + 1):
+            try:
+                return fn(*args), attempt + 1, time.monotonic()
+            except RowsRejected:
+                raise  # retrying the same rows won't help
+            except Exception as exc:
+                if attempt == UPSERT_RETRIES:
+                    raise
+                delay = UPSERT_RETRY_DELAY * 2 ** attempt
+                logger.warning("Event write failed (%s) — retrying in %.0fs.",
+                               exc, delay)
+                time.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def _write(self, batch: list[Event]) -> tuple[tuple[int, int, int], int, float, int]:
+        stored, _, _ = self._stored.result()
+        started = time.monotonic()
+        counts, retries = self._write_isolating(batch, stored)
+        finished = time.monotonic()
+        return counts, retries, finished, int((finished - started) * 1000)
+
+    def _write_isolating(self, batch: list[Event],
+                         stored: dict[str, str | None]) -> tuple[tuple[int, int, int], int]:
+        """Write ``batch``, bisecting it on RowsRejected; return (counts, retries)."""
+        try:
+            counts, attempts, _ = self._with_retries(
+                _upsert_events, self.sink, batch, stored)
+            return counts, attempts - 1
+        except RowsRejected as exc:
+            if len(batch) == 1:
+                self._quarantine(batch[0], exc)
+                return (0, 0, 0), 0
+            if self.quarantined >= MAX_DEAD_LETTERS:
+                raise _UpsertError(
+                    f"More than {MAX_DEAD_LETTERS} events rejected by the database; "
+                    f"last error: {exc.message}") from exc
+            logger.warning("Database rejected a chunk of %d events (%s) — bisecting.",
+                           len(batch), exc.message)
+        mid = len(batch) // 2
+        left, left_retries = self._write_isolating(batch[:mid], stored)
+        right, right_retries = self._write_isolating(batch[mid:], stored)
+        counts = tuple(a + b for a, b in zip(left, right))
+        return counts, left_retries + right_retries
+
+    def _quarantine(self, event: Event, exc: RowsRejected) -> None:
+        """Record a row Postgres rejected; fail once there are too many."""
+        with self._dead_letter_lock:
+            self.quarantined += 1
+            logger.warning("Quarantined event %s (%r): %s",
+                           event.event_id, event.title, exc.message)
+            if self.dead_letter_file is not None:
+                record = {
+                    "failed_at": datetime.now(timezone.utc).isoformat(),
+                    "code":      exc.code,
+                    "error":     exc.message,
+                    "event":     event._asdict(),
+                }
+                with self.dead_letter_file.open("a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record) + "\n")
+            if self.quarantined > MAX_DEAD_LETTERS:
+                raise _UpsertError(
+                    f"More than {MAX_DEAD_LETTERS} events rejected by the database; "
+                    f"last error: {exc.message}")
+
+    def _collect(self) -> None:
+        """Wait for the oldest in-flight chunk and add up its counts."""
+        future = self._in_flight.popleft()
+        try:
+            (inserted, updated, unchanged), retries, finished, latency_ms = future.result()
+        except Exception as exc:
+            raise _UpsertError(str(exc)) from exc
+        self.inserted += inserted
+        self.updated += updated
+        self.unchanged += unchanged
+        self.retries += retries
+        self._latencies_ms.append(latency_ms)
+        written_ms = int((finished - self._started) * 1000)
+        if self.first_write_ms is None or written_ms < self.first_write_ms:
+            self.first_write_ms = written_ms
+
+
+def _refresh_organizations(sink: EventSink) -> int | None:
+    """Refresh the typeahead table; a failure here doesn't fail the run."""
+    try:
+        return sink.refresh_organizations()
+    except Exception as exc:
+        logger.warning("Organization refresh failed: %s", exc)
+        return None
 
-    client.table("events").upsert(events, on_conflict="event_id").execute()
 
-    return inserted, updated
+def _reconcile(sink: EventSink, event_ids: list[str],
+               since: datetime) -> tuple[dict | None, str | None]:
+    """
+    Mark stored events ending after ``since`` that are missing from a full
+    sweep as cancelled.  ``since`` must not precede the fetch's own endsAfter
+    bound, or events the API was never asked for would count as missing.
+
+    Mirrors the zero-events check: when at least SAFETY_THRESHOLD events
+    are missing and they outnumber the events fetched, the fetch is more
+    likely truncated than the events cancelled, so nothing is marked and
+    an error is returned.  (A fetch of 0 events is the extreme case.)
+    Returns (counts, error); counts is None if the sink call failed.
+    """
+    max_missing = max(SAFETY_THRESHOLD - 1, len(event_ids))
+    try:
+        counts = sink.reconcile(SOURCE, event_ids, since, max_missing)
+    except Exception as exc:
+        logger.warning("Reconciliation failed: %s", exc)
+        return None, None
+    if counts["missing"] > max_missing:
+        msg = (
+            f"{counts['missing']} stored upcoming events are missing from a "
+            f"fetch of {len(event_ids)}. Refusing to mark them cancelled — "
+            "check the source manually."
+        )
+        logger.error(msg)
+        return counts, msg
+    if counts["cancelled"] or counts["restored"]:
+        logger.info("Marked %d vanished events cancelled, restored %d.",
+                    counts["cancelled"], counts["restored"])
+    return counts, None
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux but bytes on macOS.
+    return peak // 1024 if sys.platform == "darwin" else peak
 
 
 # ---------------------------------------------------------------------------
 # Public entry point
 # ---------------------------------------------------------------------------
 
-def run(client: Client) -> dict:
+def run(target: Client | EventSink, pool_size: int = POOL_SIZE,
+        full_sweep: bool = False, batch_size: int = BATCH_SIZE,
+        upsert_workers: int = UPSERT_WORKERS, incremental: bool = False,
+        campus_cache_file: Path | None = CAMPUS_CACHE_FILE,
+        dead_letter_file: Path | None = DEAD_LETTER_FILE) -> dict:
     """
-    Fetch getINVOLVED events and upsert into Supabase.
+    Fetch getINVOLVED events and upsert them into ``target``, an EventSink
+    or a Supabase client (wrapped in a SupabaseSink).
+
+    Events stream from the fetcher through normalisation and dedupe and
+    are written in ``batch_size`` chunks by ``upsert_workers`` threads
+    while fetching continues.
+    API runs fetch every upcoming event.  With ``incremental`` set they
+    only fetch recent changes, unless ``full_sweep`` is set, no watermark
+    has been recorded yet, or the last full sweep is FULL_SWEEP_HOURS old.
+    Campus lookups are memoized across runs in ``campus_cache_file``
+    (pass None to keep the cache in memory only).  Rows the database
+    rejects are appended to ``dead_letter_file`` instead of failing the run.
+    Successful runs finish by refreshing the sink's organizations
+    typeahead table.  After a full API sweep, stored upcoming events the
+    API no longer returns are marked cancelled (see _reconcile).
 
     Returns a summary dict:
       {
-        "fetched":  int,
-        "inserted": int,
-        "updated":  int,
-        "source":   str ("api" | "ical" | "none"),
-        "error":    str | None,
+        "fetched":     int,
+        "inserted":    int,
+        "updated":     int (changed rows),
+        "unchanged":   int (optional — only last_seen touched),
+        "source":      str ("api" | "ical" | "none"),
+        "not_modified": bool (optional — iCal answered 304),
+        "mode":        str (optional — "full" | "incremental", API only),
+        "bytes":       int (optional — API response bytes downloaded),
+        "bytes_saved": int (optional — vs. the last full sweep),
+        "first_write_ms": int | None (optional — run start → first chunk stored),
+        "upserts":     {"chunks", "retries", "p50_ms", "max_ms"} (optional),
+        "quarantined": int (optional — rows written to the dead-letter file),
+        "cancelled":   int (optional — vanished events marked after a full sweep),
+        "organizations": int | None (optional — refreshed typeahead entries),
+        "error":       str | None,
+        "connections": {"opened": int, "reused": int},
+        "peak_rss_kb": int | None,
+        "campus_cache": {"hits": int, "misses": int},
+        "timestamps":  {"iso": int, "dateutil": int, "native": int, "failed": int},
       }
     """
+    if campus_cache_file is not None:
+        _CAMPUS_CACHE.load(campus_cache_file)
+    _TIMESTAMP_STATS.update(dict.fromkeys(_TIMESTAMP_STATS, 0))
+    sink = target if isinstance(target, EventSink) else SupabaseSink(target)
+    session = _build_session(pool_size)
+    try:
+        result = _scrape(sink, session, full_sweep or not incremental, batch_size,
+                         upsert_workers, dead_letter_file)
+        result["connections"] = _connection_stats(session)
+        if not result.get("error"):
+            # Even a run that wrote nothing moves upcoming counts as events end.
+            result["organizations"] = _refresh_organizations(sink)
+    finally:
+        session.close()
+        if campus_cache_file is not None:
+            _CAMPUS_CACHE.save(campus_cache_file)
+    result["campus_cache"] = {"hits": _CAMPUS_CACHE.hits,
+                              "misses": _CAMPUS_CACHE.misses}
+    result["timestamps"] = dict(_TIMESTAMP_STATS)
+    result["peak_rss_kb"] = _peak_rss_kb()
+    return result
+
+
+def _scrape(sink: EventSink, session: requests.Session, full_sweep: bool,
+            batch_size: int, upsert_workers: int,
+            dead_letter_file: Path | None) -> dict:
     state = _load_state()
     source_state = state.get(SOURCE, {})
 
@@ -451,45 +1367,90 @@ def run(client: Client) -> dict:
         return {"fetched": 0, "inserted": 0, "updated": 0,
                 "source": "none", "error": msg}
 
-    # --- Fetch ---------------------------------------------------------------
-    events: list[dict] = []
+    # --- Fetch → normalise → dedupe → upsert ---------------------------------
     fetch_source = "none"
+    limiter = _RateLimiter(source_state.get("api_rate") or INITIAL_REQUESTS_PER_SECOND)
+    fetch_started = datetime.now(timezone.utc)
+    since = None if full_sweep else _incremental_since(source_state, fetch_started)
+    api_stats: dict = {"bytes": 0}
+    ical_stats: dict = {}
+    fetch_info: dict = {}
+    # Only remember iCal validators / the API watermark once the data
+    # behind them is stored.
+    on_success: dict = {}
+    pipeline = _Pipeline(sink, batch_size, upsert_workers, dead_letter_file)
 
     try:
-        events = _fetch_via_api()
-        fetch_source = "api"
-        logger.info("API returned %d events.", len(events))
-    except requests.HTTPError as exc:
-        status = exc.response.status_code if exc.response is not None else 0
-        if status in (403, 429):
-            logger.warning("API returned %d — falling back to iCal.", status)
-        else:
-            logger.warning("API error %d — falling back to iCal.", status)
         try:
-            events = _fetch_via_ical()
+            try:
+                pipeline.feed(_iter_api_events(session, limiter, since, api_stats))
+            finally:
+                # Next run starts from the last rate the API tolerated.
+                state.setdefault(SOURCE, {})["api_rate"] = round(limiter.rate, 3)
+            fetch_source = "api"
+            incremental = api_stats["incremental"]
+            logger.info("API returned %d events (%s, ending at %.2f req/s).",
+                        pipeline.fetched, "incremental" if incremental else "full",
+                        limiter.rate)
+            on_success["watermark"] = fetch_started.isoformat()
+            nbytes = api_stats["bytes"]
+            if incremental:
+                full_bytes = source_state.get("full_sweep_bytes") or 0
+                fetch_info = {"mode": "incremental", "bytes": nbytes,
+                              "bytes_saved": max(0, full_bytes - nbytes)}
+            else:
+                fetch_info = {"mode": "full", "bytes": nbytes, "bytes_saved": 0}
+                on_success["last_full_sweep"] = fetch_started.isoformat()
+                on_success["full_sweep_bytes"] = nbytes
+        except _UpsertError:
+            raise
+        except Exception as exc:
+            if isinstance(exc, requests.HTTPError):
+                status = exc.response.status_code if exc.response is not None else 0
+                if status in (403,) + RETRY_STATUSES:
+                    logger.warning("API returned %d — falling back to iCal.", status)
+                else:
+                    logger.warning("API error %d — falling back to iCal.", status)
+            else:
+                logger.warning("API fetch failed (%s) — falling back to iCal.", exc)
+            api_fetched = pipeline.fetched
+            try:
+                pipeline.feed(_iter_ical_events(
+                    session, source_state.get("ical_validators"), ical_stats))
+            except _UpsertError:
+                raise
+            except Exception as ical_exc:
+                logger.error("iCal fallback also failed: %s", ical_exc)
+                state = _record_failure(state)
+                return {"fetched": 0, "inserted": 0, "updated": 0,
+                        "source": "none", "error": str(ical_exc)}
             fetch_source = "ical"
-            logger.info("iCal returned %d events.", len(events))
-        except Exception as ical_exc:
-            logger.error("iCal fallback also failed: %s", ical_exc)
-            state = _record_failure(state)
-            return {"fetched": 0, "inserted": 0, "updated": 0,
-                    "source": "none", "error": str(ical_exc)}
-    except Exception as exc:
-        logger.warning("API fetch failed (%s) — falling back to iCal.", exc)
-        try:
-            events = _fetch_via_ical()
-            fetch_source = "ical"
-            logger.info("iCal returned %d events.", len(events))
-        except Exception as ical_exc:
-            logger.error("iCal fallback also failed: %s", ical_exc)
-            state = _record_failure(state)
-            return {"fetched": 0, "inserted": 0, "updated": 0,
-                    "source": "none", "error": str(ical_exc)}
+            if not ical_stats.get("not_modified"):
+                logger.info("iCal returned %d events.", pipeline.fetched - api_fetched)
+                on_success["ical_validators"] = ical_stats.get("validators")
+        pipeline.finish()
+    except _UpsertError as exc:
+        logger.error("Upsert failed: %s", exc)
+        state = _record_failure(state)
+        return {"fetched": pipeline.fetched, "inserted": pipeline.inserted,
+                "updated": pipeline.updated, "source": fetch_source,
+                "upserts": pipeline.metrics(), "quarantined": pipeline.quarantined,
+                "error": str(exc)}
+    finally:
+        pipeline.close()
+
+    if ical_stats.get("not_modified") and pipeline.fetched == 0:
+        state = _record_success(state)
+        return {"fetched": 0, "inserted": 0, "updated": 0,
+                "source": fetch_source, "not_modified": True, "error": None}
 
     # --- Safety check --------------------------------------------------------
-    if len(events) == 0:
-        stored = _get_stored_count(client)
-        if stored >= 50:
+    # Nothing has been written when nothing was fetched, so this still runs
+    # before any change to stored data.  An incremental fetch legitimately
+    # comes back empty when nothing changed.
+    if pipeline.fetched == 0 and fetch_info.get("mode") != "incremental":
+        stored = sink.stored_count(SOURCE)
+        if stored >= SAFETY_THRESHOLD:
             msg = (
                 f"Fetched 0 events but {stored} are stored. "
                 "Refusing to wipe data — check the source manually."
@@ -499,24 +1460,36 @@ def run(client: Client) -> dict:
             return {"fetched": 0, "inserted": 0, "updated": 0,
                     "source": fetch_source, "error": msg}
         logger.warning("Fetched 0 events (stored count: %d). Skipping upsert.", stored)
-        state = _record_success(state)
+        state = _record_success(state, on_success)
         return {"fetched": 0, "inserted": 0, "updated": 0,
-                "source": fetch_source, "error": None}
+                "source": fetch_source, "error": None, **fetch_info}
 
-    # --- Upsert --------------------------------------------------------------
-    try:
-        inserted, updated = _upsert_events(client, events)
-    except Exception as exc:
-        logger.error("Supabase upsert failed: %s", exc)
-        state = _record_failure(state)
-        return {"fetched": len(events), "inserted": 0, "updated": 0,
-                "source": fetch_source, "error": str(exc)}
-
-    state = _record_success(state)
-    return {
-        "fetched":  len(events),
-        "inserted": inserted,
-        "updated":  updated,
+    result = {
+        "fetched":  pipeline.fetched,
+        "inserted": pipeline.inserted,
+        "updated":  pipeline.updated,
+        "unchanged": pipeline.unchanged,
         "source":   fetch_source,
         "error":    None,
+        "first_write_ms": pipeline.first_write_ms,
+        "upserts":  pipeline.metrics(),
+        "quarantined": pipeline.quarantined,
+        **fetch_info,
     }
+
+    # --- Reconciliation ------------------------------------------------------
+    # Only a full API sweep lists every upcoming event; anything stored but
+    # not fetched has been removed at the source.
+    if fetch_source == "api" and fetch_info.get("mode") == "full":
+        window = (datetime.fromisoformat(api_stats["ends_after"]).replace(tzinfo=timezone.utc)
+                  + timedelta(hours=RECONCILE_MARGIN_HOURS))
+        counts, error = _reconcile(sink, pipeline.event_ids, window)
+        if counts is not None:
+            result["cancelled"] = counts["cancelled"]
+        if error:
+            state = _record_failure(state)
+            result["error"] = error
+            return result
+
+    state = _record_success(state, on_success)
+    return result
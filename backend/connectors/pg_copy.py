@@ -0,0 +1,147 @@
+"""
+Direct Postgres bulk-load sink for RU Events Hub.
+
+An alternative to the PostgREST write path for large backfills: chunks are
+streamed into a session-private staging table with COPY and merged into
+``events`` with one set-based INSERT ... ON CONFLICT statement.
+
+Needs psycopg 3 (``pip install "psycopg[binary]"``) and a direct connection
+string, e.g. DATABASE_URL from the Supabase dashboard (Settings → Database).
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any
+
+from connectors.getinvolved import Event
+from connectors.sinks import FINGERPRINT_WINDOW, EventSink, RowsRejected
+
+# ---------------------------------------------------------------------------
+# SQL
+# ---------------------------------------------------------------------------
+
+COLUMNS = Event._fields + ("content_hash",)
+_COLUMN_LIST = ", ".join(COLUMNS)
+
+# Temporary tables are never WAL-logged and are private to the session, so
+# each writer thread gets its own staging table without naming games.
+_CREATE_STAGING = """
+    CREATE TEMP TABLE IF NOT EXISTS events_staging
+    (LIKE events INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+"""
+
+_COPY_STAGING = f"COPY events_staging ({_COLUMN_LIST}) FROM STDIN"
+
+# events is unique on event_id, or on (event_id, start_time) once
+# migrations/005 has partitioned it.  relkind 'p' marks a partitioned table.
+_IS_PARTITIONED = "SELECT relkind = 'p' FROM pg_class WHERE oid = 'events'::regclass"
+
+
+def _merge_sql(conflict: tuple[str, ...]) -> str:
+    """
+    Set-based merge of the staging table into events.  created_at = now()
+    on a returned row means the INSERT created it rather than the ON
+    CONFLICT branch updating it (xmax would say the same, but a partitioned
+    table cannot return system columns).
+    """
+    # A merged event was fetched, so it is no longer cancelled (007).
+    updates = ", ".join([*(f"{col} = excluded.{col}" for col in COLUMNS if col not in conflict),
+                         "cancelled_at = NULL"])
+    return f"""
+        WITH upserted AS (
+            INSERT INTO events ({_COLUMN_LIST})
+            SELECT {_COLUMN_LIST} FROM events_staging
+            ON CONFLICT ({", ".join(conflict)}) DO UPDATE SET {updates}
+            RETURNING (created_at = now()) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+        FROM upserted
+    """
+
+
+class PostgresCopySink(EventSink):
+    """
+    Writes straight to Postgres, bypassing PostgREST.  Each writer thread
+    uses its own connection (and so its own staging table).
+    """
+
+    def __init__(self, dsn: str) -> None:
+        try:
+            import psycopg
+        except ImportError as exc:
+            raise RuntimeError(
+                'The COPY loader needs psycopg: pip install "psycopg[binary]"'
+            ) from exc
+        self._psycopg = psycopg
+        self.dsn = dsn
+        self._local = threading.local()
+        self._connections: list[Any] = []
+        self._lock = threading.Lock()
+        self._merge: str | None = None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._psycopg.connect(self.dsn, autocommit=True)
+            conn.execute(_CREATE_STAGING)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+                if self._merge is None:
+                    partitioned = conn.execute(_IS_PARTITIONED).fetchone()[0]
+                    self._merge = _merge_sql(
+                        ("event_id", "start_time") if partitioned else ("event_id",))
+        return conn
+
+    def stored_count(self, source: str) -> int:
+        row = self._connection().execute(
+            "SELECT stored_event_count(%s)", (source,)
+        ).fetchone()
+        return row[0]
+
+    def fingerprints(self, source: str) -> dict[str, str | None]:
+        rows = self._connection().execute(
+            "SELECT event_id, content_hash FROM events WHERE source = %s "
+            "AND coalesce(end_time, start_time) >= now() - %s",
+            (source, FINGERPRINT_WINDOW),
+        ).fetchall()
+        return dict(rows)
+
+    def write(self, rows: list[dict],
+              unchanged_ids: list[str]) -> tuple[int, int, int]:
+        """COPY ``rows`` into staging, merge them, and touch the rest."""
+        conn = self._connection()
+        try:
+            with conn.transaction(), conn.cursor() as cur:
+                with cur.copy(_COPY_STAGING) as copy:
+                    for row in rows:
+                        copy.write_row(tuple(row[col] for col in COLUMNS))
+                inserted, updated = cur.execute(self._merge).fetchone()
+                cur.execute("SELECT touch_events(%s)", (unchanged_ids,))
+                unchanged = cur.fetchone()[0]
+        except (self._psycopg.DataError, self._psycopg.IntegrityError) as exc:
+            raise RowsRejected(exc.diag.message_primary or str(exc), exc.sqlstate) from exc
+        return inserted, updated, unchanged
+
+    def refresh_organizations(self) -> int | None:
+        return self._connection().execute("SELECT refresh_organizations()").fetchone()[0]
+
+    def archive_events(self, retention: timedelta, batch_size: int) -> int:
+        return self._connection().execute(
+            "SELECT archive_events(%s, %s)", (retention, batch_size)
+        ).fetchone()[0]
+
+    def reconcile(self, source: str, event_ids: list[str], since: datetime,
+                  max_missing: int) -> dict:
+        return self._connection().execute(
+            "SELECT reconcile_events(%s, %s, %s, %s)",
+            (source, event_ids, since, max_missing),
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
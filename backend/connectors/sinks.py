@@ -0,0 +1,374 @@
+"""
+Storage sinks for RU Events Hub.
+
+A sink is where a connector's normalized events end up.  The scraper talks
+to one through the small EventSink interface, so the same pipeline can
+write to Supabase (the default), straight to Postgres with COPY
+(connectors.pg_copy) or to a local SQLite file for offline runs and
+benchmarks.
+
+Rows are passed as dicts with the Event fields plus ``content_hash``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from postgrest.exceptions import APIError
+from supabase import Client
+
+
+# SQLSTATE classes that mean the rows themselves are bad.
+_ROW_ERROR_CLASSES = ("22", "23")
+
+# fingerprints() covers events ending no earlier than this long ago, the
+# window the API can still return (see event_fingerprints in schema.sql).
+FINGERPRINT_WINDOW = timedelta(days=1)
+
+
+class RowsRejected(Exception):
+    """
+    The database refused a chunk because of its contents (a constraint or
+    type error), as opposed to a transport failure — retrying the same rows
+    won't help, but writing a subset might.
+    """
+
+    def __init__(self, message: str, code: str | None = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class EventSink(ABC):
+    """Interface implemented by every storage backend."""
+
+    @abstractmethod
+    def stored_count(self, source: str) -> int:
+        """Number of stored events from ``source``."""
+
+    @abstractmethod
+    def fingerprints(self, source: str) -> dict[str, str | None]:
+        """
+        {event_id: content_hash} for stored events from ``source`` that
+        ended no earlier than FINGERPRINT_WINDOW ago.
+        """
+
+    @abstractmethod
+    def write(self, rows: list[dict],
+              unchanged_ids: list[str]) -> tuple[int, int, int]:
+        """
+        Upsert ``rows`` (new or changed events) and bump ``last_seen`` for
+        ``unchanged_ids``.  Returns (inserted, updated, unchanged) as the
+        database counted them.  Raises RowsRejected for bad data.
+        """
+
+    @abstractmethod
+    def refresh_organizations(self) -> int | None:
+        """
+        Rebuild the organizations typeahead table from stored events and
+        return how many organizations there are (None if unsupported).
+        """
+
+    @abstractmethod
+    def archive_events(self, retention: timedelta, batch_size: int) -> int:
+        """
+        Move up to ``batch_size`` events that ended more than ``retention``
+        ago into events_archive.  Returns how many were moved; callers
+        repeat until it returns 0.
+        """
+
+    @abstractmethod
+    def reconcile(self, source: str, event_ids: list[str], since: datetime,
+                  max_missing: int) -> dict:
+        """
+        Mark ``source``'s events still running at ``since`` whose event_id
+        is not in ``event_ids`` as cancelled, unless more than
+        ``max_missing`` are missing; clear the mark on those that are back.
+        Returns {"missing", "cancelled", "restored"}.
+        """
+
+    def close(self) -> None:
+        """Release connections; the sink is not used afterwards."""
+
+
+# ---------------------------------------------------------------------------
+# Supabase (PostgREST)
+# ---------------------------------------------------------------------------
+
+class SupabaseSink(EventSink):
+    """Writes through the upsert_events() RPC defined in schema.sql."""
+
+    def __init__(self, client: Client) -> None:
+        self.client = client
+
+    def stored_count(self, source: str) -> int:
+        # Reads the trigger-maintained event_counts table (see schema.sql).
+        result = self.client.rpc("stored_event_count", {"p_source": source}).execute()
+        return result.data or 0
+
+    def fingerprints(self, source: str) -> dict[str, str | None]:
+        # event_fingerprints() aggregates them into one JSON object, so a
+        # single request covers the source regardless of PostgREST's row limit.
+        result = self.client.rpc("event_fingerprints", {"p_source": source}).execute()
+        return result.data or {}
+
+    def write(self, rows: list[dict],
+              unchanged_ids: list[str]) -> tuple[int, int, int]:
+        try:
+            result = self.client.rpc(
+                "upsert_events", {"p_events": rows, "p_touch_ids": unchanged_ids}
+            ).execute()
+        except APIError as exc:
+            # Only data exceptions (SQLSTATE class 22) and integrity
+            # violations (23) blame the rows; auth, schema-cache and server
+            # errors go to the caller's retry path unchanged.
+            if str(exc.code or "")[:2] in _ROW_ERROR_CLASSES:
+                raise RowsRejected(exc.message or str(exc), exc.code) from exc
+            raise
+        counts = result.data or {}
+        return counts.get("inserted", 0), counts.get("updated", 0), counts.get("unchanged", 0)
+
+    def refresh_organizations(self) -> int | None:
+        # Defined in migrations/004_fuzzy_search.sql.
+        return self.client.rpc("refresh_organizations", {}).execute().data
+
+    def archive_events(self, retention: timedelta, batch_size: int) -> int:
+        # Defined in migrations/006_archive_events.sql.
+        result = self.client.rpc("archive_events", {
+            "p_retention": f"{int(retention.total_seconds())} seconds",
+            "p_batch": batch_size,
+        }).execute()
+        return result.data or 0
+
+    def reconcile(self, source: str, event_ids: list[str], since: datetime,
+                  max_missing: int) -> dict:
+        # Defined in migrations/007_cancelled_events.sql.
+        result = self.client.rpc("reconcile_events", {
+            "p_source": source,
+            "p_event_ids": event_ids,
+            "p_since": since.isoformat(),
+            "p_max_missing": max_missing,
+        }).execute()
+        return result.data
+
+
+# ---------------------------------------------------------------------------
+# SQLite
+# ---------------------------------------------------------------------------
+
+# schema.sql translated to SQLite types; timestamps are ISO 8601 text.
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id           TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    event_id     TEXT UNIQUE NOT NULL,
+    source       TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    description  TEXT,
+    start_time   TEXT NOT NULL,
+    end_time     TEXT,
+    location     TEXT,
+    campus       TEXT,
+    organization TEXT,
+    category     TEXT,
+    source_url   TEXT NOT NULL,
+    last_seen    TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    created_at   TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    content_hash TEXT,
+    cancelled_at TEXT
+);
+CREATE INDEX IF NOT EXISTS events_campus_start_idx ON events (campus, start_time);
+CREATE INDEX IF NOT EXISTS events_source_start_idx ON events (source, start_time);
+CREATE INDEX IF NOT EXISTS events_start_time_idx   ON events (start_time);
+DROP INDEX IF EXISTS events_campus_idx;
+DROP INDEX IF EXISTS events_source_idx;
+CREATE TABLE IF NOT EXISTS organizations (
+    name            TEXT PRIMARY KEY,
+    upcoming_events INTEGER NOT NULL,
+    total_events    INTEGER NOT NULL,
+    refreshed_at    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events_archive (
+    id           TEXT PRIMARY KEY,
+    event_id     TEXT UNIQUE NOT NULL,
+    source       TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    description  TEXT,
+    start_time   TEXT NOT NULL,
+    end_time     TEXT,
+    location     TEXT,
+    campus       TEXT,
+    organization TEXT,
+    category     TEXT,
+    source_url   TEXT NOT NULL,
+    last_seen    TEXT NOT NULL,
+    created_at   TEXT NOT NULL,
+    content_hash TEXT,
+    archived_at  TEXT NOT NULL,
+    cancelled_at TEXT
+);
+"""
+
+_SQLITE_COLUMNS = (
+    "event_id", "source", "title", "description", "start_time", "end_time",
+    "location", "campus", "organization", "category", "source_url",
+    "last_seen", "content_hash",
+)
+
+# Existing rows are updated first and missing ones inserted second, so the
+# two rowcounts are exactly the updated and inserted counts.
+_SQLITE_UPDATE = "UPDATE events SET {}, cancelled_at = NULL WHERE event_id = :event_id".format(
+    ", ".join(f"{col} = :{col}" for col in _SQLITE_COLUMNS if col != "event_id"))
+_SQLITE_INSERT = (
+    "INSERT INTO events ({}) VALUES ({}) ON CONFLICT (event_id) DO NOTHING"
+).format(
+    ", ".join(_SQLITE_COLUMNS), ", ".join(f":{col}" for col in _SQLITE_COLUMNS))
+_SQLITE_TOUCH = "UPDATE events SET last_seen = ?, cancelled_at = NULL WHERE event_id = ?"
+_SQLITE_REFRESH_ORGANIZATIONS = """
+    INSERT INTO organizations (name, upcoming_events, total_events, refreshed_at)
+    SELECT organization,
+           sum(coalesce(end_time, start_time) >= :now AND cancelled_at IS NULL),
+           count(*),
+           :now
+    FROM events
+    WHERE organization <> ''
+    GROUP BY organization
+"""
+# Both statements pick the same batch: the same ordered LIMIT, run under
+# the writer lock in one transaction.  An event archived before and
+# scraped again replaces its archived copy, so every deleted row lands.
+_SQLITE_ARCHIVE_BATCH = """
+    SELECT id FROM events
+    WHERE coalesce(end_time, start_time) < :cutoff
+    ORDER BY start_time, id
+    LIMIT :batch
+"""
+_SQLITE_ARCHIVE = f"""
+    INSERT INTO events_archive (id, event_id, source, title, description,
+                                start_time, end_time, location, campus,
+                                organization, category, source_url, last_seen,
+                                created_at, content_hash, archived_at,
+                                cancelled_at)
+    SELECT id, event_id, source, title, description, start_time, end_time,
+           location, campus, organization, category, source_url, last_seen,
+           created_at, content_hash, :now, cancelled_at
+    FROM events WHERE id IN ({_SQLITE_ARCHIVE_BATCH})
+    ON CONFLICT (event_id) DO UPDATE SET
+        id = excluded.id, source = excluded.source, title = excluded.title,
+        description = excluded.description, start_time = excluded.start_time,
+        end_time = excluded.end_time, location = excluded.location,
+        campus = excluded.campus, organization = excluded.organization,
+        category = excluded.category, source_url = excluded.source_url,
+        last_seen = excluded.last_seen, created_at = excluded.created_at,
+        content_hash = excluded.content_hash, archived_at = excluded.archived_at,
+        cancelled_at = excluded.cancelled_at
+"""
+_SQLITE_ARCHIVE_DELETE = f"DELETE FROM events WHERE id IN ({_SQLITE_ARCHIVE_BATCH})"
+# Fetched ids go into a temp table so the set difference is one anti-join.
+_SQLITE_MISSING = """
+    FROM events
+    WHERE source = :source
+      AND cancelled_at IS NULL
+      AND coalesce(end_time, start_time) >= :since
+      AND event_id NOT IN (SELECT event_id FROM temp.reconcile_fetched)
+"""
+_SQLITE_RESTORE = """
+    UPDATE events SET cancelled_at = NULL
+    WHERE source = :source
+      AND cancelled_at IS NOT NULL
+      AND event_id IN (SELECT event_id FROM temp.reconcile_fetched)
+"""
+
+
+class SqliteSink(EventSink):
+    """
+    Local SQLite file with the same events table as schema.sql.
+
+    WAL mode lets readers (e.g. a local API) query the file while the
+    scraper writes.  SQLite has a single writer, so concurrent writer
+    threads are serialised on one connection.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        for table in ("events", "events_archive"):
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "cancelled_at" not in columns:  # files created before the column existed
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN cancelled_at TEXT")
+        self._conn.execute(
+            "CREATE TEMP TABLE reconcile_fetched (event_id TEXT PRIMARY KEY)")
+        self._lock = threading.Lock()
+
+    def stored_count(self, source: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count(*) FROM events WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0]
+
+    def fingerprints(self, source: str) -> dict[str, str | None]:
+        since = (datetime.now(timezone.utc) - FINGERPRINT_WINDOW).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT event_id, content_hash FROM events WHERE source = ? "
+                "AND coalesce(end_time, start_time) >= ?", (source, since)
+            ).fetchall()
+        return dict(rows)
+
+    def write(self, rows: list[dict],
+              unchanged_ids: list[str]) -> tuple[int, int, int]:
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            with self._lock, self._conn:
+                updated = self._conn.executemany(_SQLITE_UPDATE, rows).rowcount
+                inserted = self._conn.executemany(_SQLITE_INSERT, rows).rowcount
+                unchanged = self._conn.executemany(
+                    _SQLITE_TOUCH, ((now, event_id) for event_id in unchanged_ids)
+                ).rowcount
+        except sqlite3.IntegrityError as exc:
+            raise RowsRejected(str(exc), exc.sqlite_errorname) from exc
+        return inserted, updated, unchanged
+
+    def refresh_organizations(self) -> int | None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM organizations")
+            return self._conn.execute(_SQLITE_REFRESH_ORGANIZATIONS, {"now": now}).rowcount
+
+    def archive_events(self, retention: timedelta, batch_size: int) -> int:
+        now = datetime.now(timezone.utc)
+        params = {"cutoff": (now - retention).isoformat(), "batch": batch_size,
+                  "now": now.isoformat()}
+        with self._lock, self._conn:
+            self._conn.execute(_SQLITE_ARCHIVE, params)
+            return self._conn.execute(_SQLITE_ARCHIVE_DELETE, params).rowcount
+
+    def reconcile(self, source: str, event_ids: list[str], since: datetime,
+                  max_missing: int) -> dict:
+        params = {"source": source, "since": since.isoformat(),
+                  "now": datetime.now(timezone.utc).isoformat()}
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM temp.reconcile_fetched")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO temp.reconcile_fetched VALUES (?)",
+                ((event_id,) for event_id in event_ids))
+            missing = self._conn.execute(
+                f"SELECT count(*) {_SQLITE_MISSING}", params).fetchone()[0]
+            cancelled = 0
+            if missing <= max_missing:
+                cancelled = self._conn.execute(
+                    f"UPDATE events SET cancelled_at = :now WHERE rowid IN "
+                    f"(SELECT rowid {_SQLITE_MISSING})", params).rowcount
+            restored = self._conn.execute(_SQLITE_RESTORE, params).rowcount
+        return {"missing": missing, "cancelled": cancelled, "restored": restored}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,93 @@
+-- 001: indexes shaped like the app's queries.
+-- Apply after schema.sql (Supabase SQL editor or psql); safe to re-run.
+--
+-- The hot query is "upcoming events on campus X ordered by start_time".
+-- A (campus, start_time) index answers it with an ordered index scan that
+-- stops after LIMIT rows, where the single-column indexes needed a filter
+-- plus a sort.  On large live tables build these with CREATE INDEX
+-- CONCURRENTLY from psql instead (it cannot run inside a transaction).
+
+CREATE INDEX IF NOT EXISTS events_campus_start_idx ON events (campus, start_time);
+CREATE INDEX IF NOT EXISTS events_source_start_idx ON events (source, start_time);
+
+-- Both are covered by the leading column of the composites above.
+DROP INDEX IF EXISTS events_campus_idx;
+DROP INDEX IF EXISTS events_source_idx;
+
+-- ---------------------------------------------------------------------------
+-- Partial index over upcoming events
+-- ---------------------------------------------------------------------------
+-- Index predicates must be immutable, so "end_time > now()" is expressed
+-- with a constant cutoff that refresh_upcoming_index() moves forward each
+-- day, rebuilding the (small) index and dropping the previous one.
+-- Events without an end_time count as ending when they start.
+
+CREATE TABLE IF NOT EXISTS upcoming_cutoff (
+    id      boolean     PRIMARY KEY DEFAULT true CHECK (id),
+    cutoff  timestamptz NOT NULL
+);
+
+-- upcoming_events() reads the cutoff as the calling role, so the anon key
+-- keeps read access; only the owner and the service role (which bypasses
+-- RLS) may move it.
+ALTER TABLE upcoming_cutoff ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "anyone can read the cutoff" ON upcoming_cutoff;
+CREATE POLICY "anyone can read the cutoff" ON upcoming_cutoff FOR SELECT USING (true);
+REVOKE INSERT, UPDATE, DELETE, TRUNCATE ON TABLE upcoming_cutoff FROM anon, authenticated;
+
+CREATE OR REPLACE FUNCTION refresh_upcoming_index()
+RETURNS timestamptz
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_cutoff  timestamptz := date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    v_name    text := 'events_upcoming_' || to_char(v_cutoff AT TIME ZONE 'UTC', 'YYYYMMDD');
+    v_old     record;
+BEGIN
+    EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON events (campus, start_time) '
+        'WHERE coalesce(end_time, start_time) >= %L',
+        v_name, v_cutoff);
+    INSERT INTO upcoming_cutoff (id, cutoff) VALUES (true, v_cutoff)
+    ON CONFLICT (id) DO UPDATE SET cutoff = excluded.cutoff;
+    FOR v_old IN
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = current_schema()
+          AND tablename = 'events'
+          AND indexname LIKE 'events\_upcoming\_%'
+          AND indexname <> v_name
+    LOOP
+        EXECUTE format('DROP INDEX %I', v_old.indexname);
+    END LOOP;
+    RETURN v_cutoff;
+END;
+$$;
+
+-- Upcoming events on one campus, soonest first.  The cutoff is inlined as
+-- a literal so the planner can prove the partial index's predicate.
+CREATE OR REPLACE FUNCTION upcoming_events(p_campus text, p_limit integer DEFAULT 50)
+RETURNS SETOF events
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    v_cutoff  timestamptz;
+BEGIN
+    SELECT cutoff INTO v_cutoff FROM upcoming_cutoff;
+    RETURN QUERY EXECUTE format(
+        'SELECT * FROM events '
+        'WHERE campus = $1 '
+        '  AND coalesce(end_time, start_time) >= %L '
+        '  AND coalesce(end_time, start_time) >= now() '
+        'ORDER BY start_time '
+        'LIMIT $2',
+        coalesce(v_cutoff, now()))
+    USING p_campus, p_limit;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION refresh_upcoming_index() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_upcoming_index() TO service_role;
+
+SELECT refresh_upcoming_index();
+
+-- Move the cutoff daily.  With pg_cron enabled (Database → Extensions):
+-- SELECT cron.schedule('refresh-upcoming-index', '5 0 * * *',
+--                      'SELECT refresh_upcoming_index()');
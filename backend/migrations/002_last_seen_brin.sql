@@ -0,0 +1,14 @@
+-- 002 (optional): BRIN index on last_seen.
+--
+-- Stale-event sweeps ("not seen for N days") scan ranges of last_seen.  A
+-- BRIN index is a few pages regardless of table size, but only prunes well
+-- while last_seen follows the physical row order; check
+-- pg_stats.correlation for events.last_seen (the benchmark prints it)
+-- before relying on it.
+--
+-- Apply on Postgres 16+ only: earlier versions disable HOT updates for
+-- every indexed column, BRIN included, which would make each touch_events()
+-- bump rewrite all of the row's index entries.
+
+CREATE INDEX IF NOT EXISTS events_last_seen_brin ON events
+    USING brin (last_seen) WITH (pages_per_range = 32);
@@ -0,0 +1,59 @@
+-- 003: full-text search over events.
+--
+-- search_vector is generated from the stored columns, so every write path
+-- (upsert_events(), COPY, manual edits) keeps it current.  Descriptions are
+-- already plain text (the connector strips HTML before storing them).
+-- Weights rank title matches above organization/category, then location,
+-- then description.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(organization, '') || ' ' ||
+                                         coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS events_search_idx ON events USING gin (search_vector);
+
+-- Ranked search with keyset pagination.  p_query uses web-search syntax
+-- ("quoted phrases", OR, -exclusions).  Pass the last row's rank and
+-- event_id as p_after_rank / p_after_id to fetch the next page; unlike
+-- OFFSET, later pages cost the same as the first.
+CREATE OR REPLACE FUNCTION search_events(
+    p_query       text,
+    p_limit       integer DEFAULT 20,
+    p_after_rank  real    DEFAULT NULL,
+    p_after_id    text    DEFAULT NULL,
+    p_upcoming    boolean DEFAULT true
+)
+RETURNS TABLE (
+    event_id     text,
+    title        text,
+    start_time   timestamptz,
+    end_time     timestamptz,
+    location     text,
+    campus       text,
+    organization text,
+    category     text,
+    source_url   text,
+    rank         real
+)
+LANGUAGE sql STABLE AS $$
+    WITH matches AS (
+        SELECT e.event_id, e.title, e.start_time, e.end_time, e.location,
+               e.campus, e.organization, e.category, e.source_url,
+               ts_rank(e.search_vector, q) AS rank
+        FROM events e,
+             websearch_to_tsquery('english', p_query) AS q
+        WHERE e.search_vector @@ q
+          AND (NOT p_upcoming OR coalesce(e.end_time, e.start_time) >= now())
+    )
+    SELECT *
+    FROM matches m
+    WHERE p_after_rank IS NULL
+       OR (m.rank, m.event_id) < (p_after_rank, p_after_id)
+    ORDER BY m.rank DESC, m.event_id DESC
+    LIMIT p_limit;
+$$;
@@ -0,0 +1,118 @@
+-- 004: trigram fuzzy search and organization typeahead.
+--
+-- Misspelled club names ("rutgres robtics") miss both exact and full-text
+-- matching; trigram similarity still finds them.  GiST trigram indexes
+-- support ORDER BY distance (<->, <<->) as a nearest-neighbour scan, so the
+-- top N matches come straight off the index without ranking every row.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS events_title_trgm_idx
+    ON events USING gist (title gist_trgm_ops);
+CREATE INDEX IF NOT EXISTS events_organization_trgm_idx
+    ON events USING gist (organization gist_trgm_ops);
+
+-- Top-N upcoming events whose title or organization resembles p_query.
+CREATE OR REPLACE FUNCTION fuzzy_search_events(p_query text, p_limit integer DEFAULT 10)
+RETURNS TABLE (
+    event_id     text,
+    title        text,
+    organization text,
+    start_time   timestamptz,
+    campus       text,
+    score        real
+)
+LANGUAGE sql STABLE AS $$
+    WITH candidates AS (
+        (SELECT e.event_id FROM events e
+         WHERE e.title % p_query
+           AND coalesce(e.end_time, e.start_time) >= now()
+         ORDER BY e.title <-> p_query
+         LIMIT p_limit)
+        UNION
+        (SELECT e.event_id FROM events e
+         WHERE e.organization % p_query
+           AND coalesce(e.end_time, e.start_time) >= now()
+         ORDER BY e.organization <-> p_query
+         LIMIT p_limit)
+    )
+    SELECT e.event_id, e.title, e.organization, e.start_time, e.campus,
+           greatest(similarity(e.title, p_query),
+                    coalesce(similarity(e.organization, p_query), 0)) AS score
+    FROM candidates c
+    JOIN events e USING (event_id)
+    ORDER BY score DESC, e.start_time
+    LIMIT p_limit;
+$$;
+
+-- ---------------------------------------------------------------------------
+-- Organization typeahead
+-- ---------------------------------------------------------------------------
+-- Distinct organizations, precomputed so typeahead never touches events.
+-- The scraper calls refresh_organizations() at the end of each successful
+-- run, so upcoming counts also drop as events end.
+
+CREATE TABLE IF NOT EXISTS organizations (
+    name            text        PRIMARY KEY,
+    upcoming_events integer     NOT NULL,
+    total_events    integer     NOT NULL,
+    refreshed_at    timestamptz NOT NULL DEFAULT now()
+);
+
+-- Read-only for the app: search_organizations() runs as the calling role,
+-- and only refresh_organizations() (service role, which bypasses RLS)
+-- writes.
+ALTER TABLE organizations ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "anyone can read organizations" ON organizations;
+CREATE POLICY "anyone can read organizations" ON organizations FOR SELECT USING (true);
+REVOKE INSERT, UPDATE, DELETE, TRUNCATE ON TABLE organizations FROM anon, authenticated;
+
+CREATE INDEX IF NOT EXISTS organizations_name_trgm_idx
+    ON organizations USING gist (name gist_trgm_ops);
+
+-- Rebuilds organizations from events; returns how many there are.
+CREATE OR REPLACE FUNCTION refresh_organizations()
+RETURNS integer
+LANGUAGE sql AS $$
+    WITH agg AS (
+        SELECT organization AS name,
+               count(*) FILTER (WHERE coalesce(end_time, start_time) >= now()) AS upcoming,
+               count(*) AS total
+        FROM events
+        WHERE organization <> ''
+        GROUP BY organization
+    ),
+    removed AS (
+        DELETE FROM organizations o
+        WHERE NOT EXISTS (SELECT 1 FROM agg WHERE agg.name = o.name)
+    ),
+    upserted AS (
+        INSERT INTO organizations (name, upcoming_events, total_events, refreshed_at)
+        SELECT name, upcoming, total, now() FROM agg
+        ON CONFLICT (name) DO UPDATE SET
+            upcoming_events = excluded.upcoming_events,
+            total_events    = excluded.total_events,
+            refreshed_at    = excluded.refreshed_at
+        WHERE (organizations.upcoming_events, organizations.total_events)
+              IS DISTINCT FROM (excluded.upcoming_events, excluded.total_events)
+    )
+    SELECT count(*)::integer FROM agg;
+$$;
+
+REVOKE EXECUTE ON FUNCTION refresh_organizations() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_organizations() TO service_role;
+
+-- Organizations whose name contains something like p_query, best first.
+-- Word similarity matches a partial, misspelled prefix against any part of
+-- the name ("robtic" → "Rutgers Robotics Club").
+CREATE OR REPLACE FUNCTION search_organizations(p_query text, p_limit integer DEFAULT 10)
+RETURNS TABLE (name text, upcoming_events integer, score real)
+LANGUAGE sql STABLE AS $$
+    SELECT o.name, o.upcoming_events, word_similarity(p_query, o.name) AS score
+    FROM organizations o
+    WHERE p_query <% o.name
+    ORDER BY p_query <<-> o.name, o.upcoming_events DESC
+    LIMIT p_limit;
+$$;
+
+SELECT refresh_organizations();
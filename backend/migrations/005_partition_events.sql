@@ -0,0 +1,324 @@
+-- 005: range-partition events by month on start_time.
+--
+-- Old months then live in their own tables: indexes stay proportional to
+-- the months still attached, upcoming-event queries prune to a few
+-- partitions, and history leaves the hot table by detaching a partition
+-- instead of deleting rows.
+--
+-- Uniqueness on a partitioned table has to include the partition key, so
+-- the unique key becomes (event_id, start_time).  event_id is a hash of
+-- title, start_time and source (make_event_id), so one event_id always
+-- comes with the same start_time and the pair is exactly as strict as
+-- event_id alone.  upsert_events() is redefined below with the new
+-- conflict target; the COPY sink detects the partitioned table itself.
+--
+-- Row-level security, the table's policies, its privileges and its
+-- publication membership (e.g. supabase_realtime) are carried over to the
+-- new table.  Partitions can be queried on their own, where none of the
+-- parent's RLS or privileges apply, so every partition gets RLS with no
+-- policies and no privileges for anon / authenticated.
+--
+-- Run after 001-004, in one transaction, during a quiet period (between
+-- scrapes): the table is rewritten.
+
+BEGIN;
+
+-- ---------------------------------------------------------------------------
+-- Partition management
+-- ---------------------------------------------------------------------------
+-- Partitions are named events_pYYYY_MM.  Rows outside every partition land
+-- in events_default; creating a month that already has rows there moves
+-- them into the new partition first.  See the header for why partitions
+-- have RLS enabled.
+
+CREATE OR REPLACE FUNCTION create_event_partitions(
+    p_months_ahead integer     DEFAULT 13,
+    p_from         timestamptz DEFAULT now()
+)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_month    timestamptz := date_trunc('month', p_from AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    v_last     timestamptz := date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                              + make_interval(months => p_months_ahead);
+    v_next     timestamptz;
+    v_name     text;
+    v_columns  text;
+    v_created  integer := 0;
+BEGIN
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO v_columns
+    FROM pg_attribute
+    WHERE attrelid = 'events'::regclass AND attnum > 0
+      AND NOT attisdropped AND attgenerated = '';
+
+    WHILE v_month <= v_last LOOP
+        v_next := v_month + interval '1 month';
+        v_name := 'events_p' || to_char(v_month AT TIME ZONE 'UTC', 'YYYY_MM');
+        IF to_regclass(v_name) IS NULL THEN
+            IF EXISTS (SELECT 1 FROM events_default
+                       WHERE start_time >= v_month AND start_time < v_next) THEN
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE events INCLUDING DEFAULTS '
+                    'INCLUDING CONSTRAINTS INCLUDING GENERATED)', v_name);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM events_default '
+                    'WHERE start_time >= %L AND start_time < %L RETURNING %s) '
+                    'INSERT INTO %I (%s) SELECT %s FROM moved',
+                    v_month, v_next, v_columns, v_name, v_columns, v_columns);
+                EXECUTE format(
+                    'ALTER TABLE events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_month, v_next);
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF events FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_month, v_next);
+            END IF;
+            EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_name);
+            EXECUTE format('REVOKE ALL ON TABLE %I FROM anon, authenticated', v_name);
+            v_created := v_created + 1;
+        END IF;
+        v_month := v_next;
+    END LOOP;
+    RETURN v_created;
+END;
+$$;
+
+-- Detach months that ended more than p_keep_months ago and move them to
+-- the archive schema, where they stay queryable.  Detaching fires no
+-- DELETE triggers, so their rows are taken out of event_counts here.
+CREATE SCHEMA IF NOT EXISTS archive;
+
+CREATE OR REPLACE FUNCTION archive_event_partitions(p_keep_months integer DEFAULT 12)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_cutoff    timestamptz := date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                               - make_interval(months => p_keep_months);
+    v_partition record;
+    v_archived  integer := 0;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'events'::regclass
+          AND c.relname ~ '^events_p\d{4}_\d{2}$'
+          AND to_date(substr(c.relname, 9), 'YYYY_MM') + interval '1 month'
+              <= v_cutoff AT TIME ZONE 'UTC'
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format(
+            'INSERT INTO event_counts (source, campus, n) '
+            'SELECT source, coalesce(campus, %L), -count(*) FROM %I GROUP BY 1, 2 ORDER BY 1, 2 '
+            'ON CONFLICT (source, campus) DO UPDATE SET n = event_counts.n + excluded.n',
+            '', v_partition.relname);
+        EXECUTE format('ALTER TABLE events DETACH PARTITION %I', v_partition.relname);
+        EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_partition.relname);
+        v_archived := v_archived + 1;
+    END LOOP;
+    RETURN v_archived;
+END;
+$$;
+
+-- ---------------------------------------------------------------------------
+-- Conversion
+-- ---------------------------------------------------------------------------
+
+-- Row-level security, policies, privileges and publication membership
+-- belong to the table, not its name, so they are noted here and put back
+-- on the new table below.
+CREATE TEMP TABLE events_rls ON COMMIT DROP AS
+SELECT relrowsecurity, relforcerowsecurity FROM pg_class WHERE oid = 'events'::regclass;
+
+CREATE TEMP TABLE events_policies ON COMMIT DROP AS
+SELECT policyname, permissive, roles, cmd, qual, with_check
+FROM pg_policies
+WHERE (quote_ident(schemaname) || '.' || quote_ident(tablename))::regclass = 'events'::regclass;
+
+CREATE TEMP TABLE events_grants ON COMMIT DROP AS
+SELECT a.grantee, a.privilege_type, a.is_grantable
+FROM pg_class c, aclexplode(coalesce(c.relacl, acldefault('r', c.relowner))) AS a
+WHERE c.oid = 'events'::regclass AND a.grantee <> c.relowner;
+
+CREATE TEMP TABLE events_publications ON COMMIT DROP AS
+SELECT p.pubname
+FROM pg_publication_rel r
+JOIN pg_publication p ON p.oid = r.prpubid
+WHERE r.prrelid = 'events'::regclass;
+
+ALTER TABLE events RENAME TO events_unpartitioned;
+
+CREATE TABLE events (
+    LIKE events_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED,
+    PRIMARY KEY (id, start_time),
+    UNIQUE (event_id, start_time)
+) PARTITION BY RANGE (start_time);
+
+CREATE TABLE events_default PARTITION OF events DEFAULT;
+ALTER TABLE events_default ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON TABLE events_default FROM anon, authenticated;
+
+SELECT create_event_partitions(
+    p_from => coalesce((SELECT min(start_time) FROM events_unpartitioned), now()));
+
+-- Copied before the counter triggers exist: event_counts already has these rows.
+INSERT INTO events (id, event_id, source, title, description, start_time, end_time,
+                    location, campus, organization, category, source_url,
+                    last_seen, created_at, content_hash)
+SELECT id, event_id, source, title, description, start_time, end_time,
+       location, campus, organization, category, source_url,
+       last_seen, created_at, content_hash
+FROM events_unpartitioned;
+
+-- Also drops what depended on the old table: its indexes and triggers, and
+-- upcoming_events() (which returns its row type).  All are recreated below.
+DROP TABLE events_unpartitioned CASCADE;
+
+-- Indexes from schema.sql and migrations 001, 003 and 004, now created per
+-- partition.  Re-apply 002 if you use the BRIN index.
+CREATE INDEX events_start_time_idx        ON events (start_time);
+CREATE INDEX events_campus_start_idx      ON events (campus, start_time);
+CREATE INDEX events_source_start_idx      ON events (source, start_time);
+CREATE INDEX events_search_idx            ON events USING gin (search_vector);
+CREATE INDEX events_title_trgm_idx        ON events USING gist (title gist_trgm_ops);
+CREATE INDEX events_organization_trgm_idx ON events USING gist (organization gist_trgm_ops);
+SELECT refresh_upcoming_index();
+
+CREATE TRIGGER events_count_insert AFTER INSERT ON events
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+CREATE TRIGGER events_count_update AFTER UPDATE ON events
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+CREATE TRIGGER events_count_delete AFTER DELETE ON events
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+CREATE TRIGGER events_count_truncate AFTER TRUNCATE ON events
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_reset();
+
+DO $$
+DECLARE
+    v_policy      record;
+    v_grantee     oid;
+    v_grant       record;
+    v_publication name;
+BEGIN
+    IF (SELECT relrowsecurity FROM events_rls) THEN
+        ALTER TABLE events ENABLE ROW LEVEL SECURITY;
+    END IF;
+    IF (SELECT relforcerowsecurity FROM events_rls) THEN
+        ALTER TABLE events FORCE ROW LEVEL SECURITY;
+    END IF;
+    FOR v_policy IN SELECT * FROM events_policies LOOP
+        EXECUTE format('CREATE POLICY %I ON events AS %s FOR %s TO %s',
+                       v_policy.policyname, v_policy.permissive, v_policy.cmd,
+                       (SELECT string_agg(quote_ident(r), ', ') FROM unnest(v_policy.roles) AS r))
+             || coalesce(' USING (' || v_policy.qual || ')', '')
+             || coalesce(' WITH CHECK (' || v_policy.with_check || ')', '');
+    END LOOP;
+
+    -- The new table got the schema's default privileges; replace them
+    -- with the old table's.  Grantee 0 is PUBLIC.
+    FOR v_grantee IN
+        SELECT DISTINCT a.grantee
+        FROM pg_class c, aclexplode(c.relacl) AS a
+        WHERE c.oid = 'events'::regclass AND a.grantee <> c.relowner
+    LOOP
+        EXECUTE format('REVOKE ALL ON TABLE events FROM %s',
+                       CASE WHEN v_grantee = 0 THEN 'PUBLIC' ELSE v_grantee::regrole::text END);
+    END LOOP;
+    FOR v_grant IN SELECT * FROM events_grants LOOP
+        EXECUTE format('GRANT %s ON TABLE events TO %s', v_grant.privilege_type,
+                       CASE WHEN v_grant.grantee = 0 THEN 'PUBLIC'
+                            ELSE v_grant.grantee::regrole::text END)
+             || CASE WHEN v_grant.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END;
+    END LOOP;
+
+    -- Changes are published under the name "events" (not the partition's)
+    -- only with publish_via_partition_root, which Realtime subscribers to
+    -- events rely on.  The option applies to the whole publication but
+    -- only changes anything for partitioned tables.
+    FOR v_publication IN SELECT pubname FROM events_publications LOOP
+        EXECUTE format('ALTER PUBLICATION %I ADD TABLE events', v_publication);
+        EXECUTE format('ALTER PUBLICATION %I SET (publish_via_partition_root = true)',
+                       v_publication);
+    END LOOP;
+END;
+$$;
+
+-- As in 001.
+CREATE OR REPLACE FUNCTION upcoming_events(p_campus text, p_limit integer DEFAULT 50)
+RETURNS SETOF events
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    v_cutoff  timestamptz;
+BEGIN
+    SELECT cutoff INTO v_cutoff FROM upcoming_cutoff;
+    RETURN QUERY EXECUTE format(
+        'SELECT * FROM events '
+        'WHERE campus = $1 '
+        '  AND coalesce(end_time, start_time) >= %L '
+        '  AND coalesce(end_time, start_time) >= now() '
+        'ORDER BY start_time '
+        'LIMIT $2',
+        coalesce(v_cutoff, now()))
+    USING p_campus, p_limit;
+END;
+$$;
+
+-- As in schema.sql, with the partitioned table's conflict target.  A
+-- partitioned table cannot return system columns, so inserts are told
+-- apart by created_at instead of xmax: it defaults to now(), the
+-- transaction's start, and the ON CONFLICT branch never changes it.
+CREATE OR REPLACE FUNCTION upsert_events(p_events jsonb,
+                                         p_touch_ids text[] DEFAULT '{}')
+RETURNS jsonb
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_inserted  integer;
+    v_updated   integer;
+BEGIN
+    WITH upserted AS (
+        INSERT INTO events (event_id, source, title, description, start_time,
+                            end_time, location, campus, organization, category,
+                            source_url, last_seen, content_hash)
+        SELECT event_id, source, title, description, start_time,
+               end_time, location, campus, organization, category,
+               source_url, last_seen, content_hash
+        FROM jsonb_to_recordset(p_events) AS e (
+            event_id text, source text, title text, description text,
+            start_time timestamptz, end_time timestamptz, location text,
+            campus text, organization text, category text, source_url text,
+            last_seen timestamptz, content_hash text)
+        ON CONFLICT (event_id, start_time) DO UPDATE SET
+            source       = excluded.source,
+            title        = excluded.title,
+            description  = excluded.description,
+            end_time     = excluded.end_time,
+            location     = excluded.location,
+            campus       = excluded.campus,
+            organization = excluded.organization,
+            category     = excluded.category,
+            source_url   = excluded.source_url,
+            last_seen    = excluded.last_seen,
+            content_hash = excluded.content_hash
+        RETURNING (created_at = now()) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+    INTO v_inserted, v_updated
+    FROM upserted;
+
+    RETURN jsonb_build_object(
+        'inserted',  v_inserted,
+        'updated',   v_updated,
+        'unchanged', touch_events(p_touch_ids)
+    );
+END;
+$$;
+
+COMMIT;
+
+-- Keep a year of future months ready and archive old ones monthly.  With
+-- pg_cron enabled (Database → Extensions):
+-- SELECT cron.schedule('event-partitions', '10 0 1 * *',
+--     'SELECT create_event_partitions(); SELECT archive_event_partitions()');
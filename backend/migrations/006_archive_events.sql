@@ -0,0 +1,93 @@
+-- 006: move long-finished events out of the hot events table.
+--
+-- Upserts never delete, so events keeps every event ever scraped while the
+-- app only shows upcoming ones.  archive_events() moves rows that ended
+-- more than p_retention ago into events_archive, one bounded batch per
+-- call; `run_scraper.py --archive` calls it until nothing is left.
+--
+-- Each call is its own transaction, so an interrupted run loses at most
+-- one batch of work and simply resumes on the next run.  Rows are claimed
+-- with FOR UPDATE SKIP LOCKED, so a batch never waits on (or blocks) a
+-- scrape writing the same rows; anything skipped is picked up later.  An
+-- archived event can still come back (the iCal fallback is not bounded by
+-- date); archiving it again replaces the archived copy, so no row is
+-- deleted from events without landing in events_archive.
+--
+-- On a partitioned events table (005), archive_event_partitions() is the
+-- cheaper way to retire whole months; this function handles the rest.
+
+CREATE TABLE IF NOT EXISTS events_archive (
+    LIKE events INCLUDING DEFAULTS,
+    archived_at timestamptz NOT NULL DEFAULT now(),
+    UNIQUE (event_id)
+);
+
+-- Nothing reads the archive through PostgREST; the service role bypasses
+-- RLS.
+ALTER TABLE events_archive ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON TABLE events_archive FROM anon, authenticated;
+
+CREATE INDEX IF NOT EXISTS events_archive_source_start_idx
+    ON events_archive (source, start_time);
+
+-- Moves up to p_batch events whose end (or start, when there is no end)
+-- is older than now() - p_retention, and returns how many it moved.
+-- The start_time bound is implied by the coalesce one (events end after
+-- they start) and lets the batch come off the start_time index.
+CREATE OR REPLACE FUNCTION archive_events(
+    p_retention interval DEFAULT '30 days',
+    p_batch     integer  DEFAULT 5000
+)
+RETURNS integer
+LANGUAGE sql AS $$
+    WITH claimed AS (
+        SELECT id, start_time FROM events
+        WHERE start_time < now() - p_retention
+          AND coalesce(end_time, start_time) < now() - p_retention
+        ORDER BY start_time
+        LIMIT p_batch
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        DELETE FROM events e
+        USING claimed c
+        WHERE e.id = c.id AND e.start_time = c.start_time
+        RETURNING e.*
+    ),
+    archived AS (
+        INSERT INTO events_archive (id, event_id, source, title, description,
+                                    start_time, end_time, location, campus,
+                                    organization, category, source_url,
+                                    last_seen, created_at, content_hash)
+        SELECT id, event_id, source, title, description,
+               start_time, end_time, location, campus,
+               organization, category, source_url,
+               last_seen, created_at, content_hash
+        FROM moved
+        ON CONFLICT (event_id) DO UPDATE SET
+            id           = excluded.id,
+            source       = excluded.source,
+            title        = excluded.title,
+            description  = excluded.description,
+            end_time     = excluded.end_time,
+            location     = excluded.location,
+            campus       = excluded.campus,
+            organization = excluded.organization,
+            category     = excluded.category,
+            source_url   = excluded.source_url,
+            last_seen    = excluded.last_seen,
+            created_at   = excluded.created_at,
+            content_hash = excluded.content_hash,
+            archived_at  = excluded.archived_at
+    )
+    SELECT count(*)::integer FROM moved;
+$$;
+
+-- Deletes rows, so it must not be callable through PostgREST by the anon
+-- or authenticated roles.
+REVOKE EXECUTE ON FUNCTION archive_events(interval, integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION archive_events(interval, integer) TO service_role;
+
+-- Nightly with pg_cron enabled (Database → Extensions); each call moves
+-- one batch, so repeat it or run `run_scraper.py --archive` for backlogs:
+-- SELECT cron.schedule('archive-events', '30 3 * * *', 'SELECT archive_events()');
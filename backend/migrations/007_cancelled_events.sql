@@ -0,0 +1,335 @@
+-- 007: mark events that vanished from the source as cancelled.
+--
+-- An organizer cancelling an event just removes it from the API; upserts
+-- never notice, so the row would stay listed forever.  After a full API
+-- sweep the scraper passes every event_id it fetched to
+-- reconcile_events(), which stamps cancelled_at on the source's upcoming
+-- events that were not among them.  An event that shows up again is
+-- un-cancelled: touch_events() and upsert_events() clear the stamp for
+-- the events they write, and reconcile_events() for the rest.
+--
+-- The read paths from 001, 003 and 004 are redefined below to skip
+-- cancelled events, and archive_events() (006) keeps the stamp.
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS cancelled_at timestamptz;
+ALTER TABLE events_archive ADD COLUMN IF NOT EXISTS cancelled_at timestamptz;
+
+-- As in schema.sql, also clearing cancelled_at: a touched event was fetched.
+CREATE OR REPLACE FUNCTION touch_events(p_event_ids text[])
+RETURNS integer
+LANGUAGE sql AS $$
+    WITH touched AS (
+        UPDATE events SET last_seen = now(), cancelled_at = NULL
+        WHERE event_id = ANY (p_event_ids)
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM touched;
+$$;
+
+-- As in 005, also clearing cancelled_at.  The conflict target includes
+-- start_time only where events is partitioned, so this also works where
+-- 005 was not applied.
+DO $do$
+BEGIN
+    EXECUTE format($fn$
+        CREATE OR REPLACE FUNCTION upsert_events(p_events jsonb,
+                                                 p_touch_ids text[] DEFAULT '{}')
+        RETURNS jsonb
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v_inserted  integer;
+            v_updated   integer;
+        BEGIN
+            WITH upserted AS (
+                INSERT INTO events (event_id, source, title, description, start_time,
+                                    end_time, location, campus, organization, category,
+                                    source_url, last_seen, content_hash)
+                SELECT event_id, source, title, description, start_time,
+                       end_time, location, campus, organization, category,
+                       source_url, last_seen, content_hash
+                FROM jsonb_to_recordset(p_events) AS e (
+                    event_id text, source text, title text, description text,
+                    start_time timestamptz, end_time timestamptz, location text,
+                    campus text, organization text, category text, source_url text,
+                    last_seen timestamptz, content_hash text)
+                ON CONFLICT (%s) DO UPDATE SET
+                    source       = excluded.source,
+                    title        = excluded.title,
+                    description  = excluded.description,
+                    start_time   = excluded.start_time,
+                    end_time     = excluded.end_time,
+                    location     = excluded.location,
+                    campus       = excluded.campus,
+                    organization = excluded.organization,
+                    category     = excluded.category,
+                    source_url   = excluded.source_url,
+                    last_seen    = excluded.last_seen,
+                    content_hash = excluded.content_hash,
+                    cancelled_at = NULL
+                RETURNING (created_at = now()) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+            INTO v_inserted, v_updated
+            FROM upserted;
+
+            RETURN jsonb_build_object(
+                'inserted',  v_inserted,
+                'updated',   v_updated,
+                'unchanged', touch_events(p_touch_ids)
+            );
+        END;
+        $$
+    $fn$, CASE (SELECT relkind FROM pg_class WHERE oid = 'events'::regclass)
+              WHEN 'p' THEN 'event_id, start_time'
+              ELSE 'event_id'
+          END);
+END
+$do$;
+
+-- Set difference in one round trip: stored, not-yet-cancelled events of
+-- p_source still running at p_since (a bound inside the fetch's endsAfter
+-- window) whose event_id is not in p_event_ids.  The ids are unnested once
+-- and anti-joined, so the cost is a hash of the fetched ids plus a scan of
+-- the source's rows.
+--
+-- Nothing is marked when more than p_max_missing events are missing — a
+-- truncated fetch looks exactly like a mass cancellation — so the caller
+-- can refuse the run.  Returns {"missing", "cancelled", "restored"}.
+CREATE OR REPLACE FUNCTION reconcile_events(
+    p_source      text,
+    p_event_ids   text[],
+    p_since       timestamptz,
+    p_max_missing integer
+)
+RETURNS jsonb
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_missing   integer;
+    v_cancelled integer := 0;
+    v_restored  integer;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS reconcile_fetched (event_id text PRIMARY KEY)
+        ON COMMIT DELETE ROWS;
+    TRUNCATE reconcile_fetched;
+    INSERT INTO reconcile_fetched
+    SELECT DISTINCT unnest(p_event_ids);
+    ANALYZE reconcile_fetched;
+
+    SELECT count(*) INTO v_missing
+    FROM events e
+    WHERE e.source = p_source
+      AND e.cancelled_at IS NULL
+      AND coalesce(e.end_time, e.start_time) >= p_since
+      AND NOT EXISTS (SELECT 1 FROM reconcile_fetched f WHERE f.event_id = e.event_id);
+
+    IF v_missing <= p_max_missing THEN
+        UPDATE events e SET cancelled_at = now()
+        WHERE e.source = p_source
+          AND e.cancelled_at IS NULL
+          AND coalesce(e.end_time, e.start_time) >= p_since
+          AND NOT EXISTS (SELECT 1 FROM reconcile_fetched f WHERE f.event_id = e.event_id);
+        GET DIAGNOSTICS v_cancelled = ROW_COUNT;
+    END IF;
+
+    UPDATE events e SET cancelled_at = NULL
+    FROM reconcile_fetched f
+    WHERE e.event_id = f.event_id
+      AND e.source = p_source
+      AND e.cancelled_at IS NOT NULL;
+    GET DIAGNOSTICS v_restored = ROW_COUNT;
+
+    RETURN jsonb_build_object(
+        'missing',   v_missing,
+        'cancelled', v_cancelled,
+        'restored',  v_restored
+    );
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION reconcile_events(text, text[], timestamptz, integer)
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reconcile_events(text, text[], timestamptz, integer) TO service_role;
+
+-- ---------------------------------------------------------------------------
+-- Read paths skip cancelled events
+-- ---------------------------------------------------------------------------
+
+-- As in 001 (and 005).
+CREATE OR REPLACE FUNCTION upcoming_events(p_campus text, p_limit integer DEFAULT 50)
+RETURNS SETOF events
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    v_cutoff  timestamptz;
+BEGIN
+    SELECT cutoff INTO v_cutoff FROM upcoming_cutoff;
+    RETURN QUERY EXECUTE format(
+        'SELECT * FROM events '
+        'WHERE campus = $1 '
+        '  AND coalesce(end_time, start_time) >= %L '
+        '  AND coalesce(end_time, start_time) >= now() '
+        '  AND cancelled_at IS NULL '
+        'ORDER BY start_time '
+        'LIMIT $2',
+        coalesce(v_cutoff, now()))
+    USING p_campus, p_limit;
+END;
+$$;
+
+-- As in 003.
+CREATE OR REPLACE FUNCTION search_events(
+    p_query       text,
+    p_limit       integer DEFAULT 20,
+    p_after_rank  real    DEFAULT NULL,
+    p_after_id    text    DEFAULT NULL,
+    p_upcoming    boolean DEFAULT true
+)
+RETURNS TABLE (
+    event_id     text,
+    title        text,
+    start_time   timestamptz,
+    end_time     timestamptz,
+    location     text,
+    campus       text,
+    organization text,
+    category     text,
+    source_url   text,
+    rank         real
+)
+LANGUAGE sql STABLE AS $$
+    WITH matches AS (
+        SELECT e.event_id, e.title, e.start_time, e.end_time, e.location,
+               e.campus, e.organization, e.category, e.source_url,
+               ts_rank(e.search_vector, q) AS rank
+        FROM events e,
+             websearch_to_tsquery('english', p_query) AS q
+        WHERE e.search_vector @@ q
+          AND e.cancelled_at IS NULL
+          AND (NOT p_upcoming OR coalesce(e.end_time, e.start_time) >= now())
+    )
+    SELECT *
+    FROM matches m
+    WHERE p_after_rank IS NULL
+       OR (m.rank, m.event_id) < (p_after_rank, p_after_id)
+    ORDER BY m.rank DESC, m.event_id DESC
+    LIMIT p_limit;
+$$;
+
+-- As in 004.
+CREATE OR REPLACE FUNCTION fuzzy_search_events(p_query text, p_limit integer DEFAULT 10)
+RETURNS TABLE (
+    event_id     text,
+    title        text,
+    organization text,
+    start_time   timestamptz,
+    campus       text,
+    score        real
+)
+LANGUAGE sql STABLE AS $$
+    WITH candidates AS (
+        (SELECT e.event_id FROM events e
+         WHERE e.title % p_query
+           AND coalesce(e.end_time, e.start_time) >= now()
+           AND e.cancelled_at IS NULL
+         ORDER BY e.title <-> p_query
+         LIMIT p_limit)
+        UNION
+        (SELECT e.event_id FROM events e
+         WHERE e.organization % p_query
+           AND coalesce(e.end_time, e.start_time) >= now()
+           AND e.cancelled_at IS NULL
+         ORDER BY e.organization <-> p_query
+         LIMIT p_limit)
+    )
+    SELECT e.event_id, e.title, e.organization, e.start_time, e.campus,
+           greatest(similarity(e.title, p_query),
+                    coalesce(similarity(e.organization, p_query), 0)) AS score
+    FROM candidates c
+    JOIN events e USING (event_id)
+    ORDER BY score DESC, e.start_time
+    LIMIT p_limit;
+$$;
+
+-- As in 004; cancelled events no longer count as upcoming.
+CREATE OR REPLACE FUNCTION refresh_organizations()
+RETURNS integer
+LANGUAGE sql AS $$
+    WITH agg AS (
+        SELECT organization AS name,
+               count(*) FILTER (WHERE coalesce(end_time, start_time) >= now()
+                                  AND cancelled_at IS NULL) AS upcoming,
+               count(*) AS total
+        FROM events
+        WHERE organization <> ''
+        GROUP BY organization
+    ),
+    removed AS (
+        DELETE FROM organizations o
+        WHERE NOT EXISTS (SELECT 1 FROM agg WHERE agg.name = o.name)
+    ),
+    upserted AS (
+        INSERT INTO organizations (name, upcoming_events, total_events, refreshed_at)
+        SELECT name, upcoming, total, now() FROM agg
+        ON CONFLICT (name) DO UPDATE SET
+            upcoming_events = excluded.upcoming_events,
+            total_events    = excluded.total_events,
+            refreshed_at    = excluded.refreshed_at
+        WHERE (organizations.upcoming_events, organizations.total_events)
+              IS DISTINCT FROM (excluded.upcoming_events, excluded.total_events)
+    )
+    SELECT count(*)::integer FROM agg;
+$$;
+
+-- As in 006, also archiving cancelled_at.
+CREATE OR REPLACE FUNCTION archive_events(
+    p_retention interval DEFAULT '30 days',
+    p_batch     integer  DEFAULT 5000
+)
+RETURNS integer
+LANGUAGE sql AS $$
+    WITH claimed AS (
+        SELECT id, start_time FROM events
+        WHERE start_time < now() - p_retention
+          AND coalesce(end_time, start_time) < now() - p_retention
+        ORDER BY start_time
+        LIMIT p_batch
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        DELETE FROM events e
+        USING claimed c
+        WHERE e.id = c.id AND e.start_time = c.start_time
+        RETURNING e.*
+    ),
+    archived AS (
+        INSERT INTO events_archive (id, event_id, source, title, description,
+                                    start_time, end_time, location, campus,
+                                    organization, category, source_url,
+                                    last_seen, created_at, content_hash,
+                                    cancelled_at)
+        SELECT id, event_id, source, title, description,
+               start_time, end_time, location, campus,
+               organization, category, source_url,
+               last_seen, created_at, content_hash,
+               cancelled_at
+        FROM moved
+        ON CONFLICT (event_id) DO UPDATE SET
+            id           = excluded.id,
+            source       = excluded.source,
+            title        = excluded.title,
+            description  = excluded.description,
+            end_time     = excluded.end_time,
+            location     = excluded.location,
+            campus       = excluded.campus,
+            organization = excluded.organization,
+            category     = excluded.category,
+            source_url   = excluded.source_url,
+            last_seen    = excluded.last_seen,
+            created_at   = excluded.created_at,
+            content_hash = excluded.content_hash,
+            archived_at  = excluded.archived_at,
+            cancelled_at = excluded.cancelled_at
+    )
+    SELECT count(*)::integer FROM moved;
+$$;
+
+SELECT refresh_organizations();
@@ -4,7 +4,17 @@ RU Events Hub — main scraper runner.
 
 Usage:
     python backend/run_scraper.py
+    python backend/run_scraper.py --incremental         # fetch only changes between full sweeps
+    python backend/run_scraper.py --full-sweep          # ignore the incremental watermark
+    python backend/run_scraper.py --sink copy           # write via Postgres COPY (DATABASE_URL)
+    python backend/run_scraper.py --sink sqlite         # write to a local SQLite file
     python backend/run_scraper.py --reset-kill-switch   # clears kill switch manually
+    python backend/run_scraper.py --archive             # move finished events to events_archive
+
+Tuning (optional environment variables):
+    SCRAPER_POOL_SIZE       keep-alive HTTP connections to Campus Labs
+    SCRAPER_BATCH_SIZE      events per Supabase upsert chunk
+    SCRAPER_UPSERT_WORKERS  upsert chunks written concurrently
 """
 
 from __future__ import annotations
@@ -13,7 +23,8 @@ import argparse
 import json
 import logging
 import sys
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -25,6 +36,7 @@ load_dotenv(_ROOT / ".env")
 
 from supabase import create_client  # noqa: E402 — must come after load_dotenv
 from connectors import getinvolved  # noqa: E402
+from connectors.sinks import SqliteSink, SupabaseSink  # noqa: E402
 
 # ---------------------------------------------------------------------------
 # Logging setup
@@ -39,6 +51,10 @@ logging.basicConfig(
 logger = logging.getLogger("run_scraper")
 
 STATE_FILE = Path(__file__).parent / "state.json"
+SQLITE_FILE = Path(__file__).parent / "events.db"
+
+ARCHIVE_RETENTION_DAYS = 30   # keep events this long after they end
+ARCHIVE_BATCH_SIZE = 5000     # events moved per transaction
 
 
 # ---------------------------------------------------------------------------
@@ -47,16 +63,45 @@ STATE_FILE = Path(__file__).parent / "state.json"
 
 def _build_supabase_client():
     url = os.getenv("SUPABASE_URL")
-    # Prefer the service role key (bypasses RLS) for backend scraping.
-    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    # The write RPCs (upsert_events, touch_events) are granted to the
+    # service role only; see schema.sql.
+    key = os.getenv("SUPABASE_SERVICE_KEY")
     if not url or not key:
         logger.error(
-            "SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_ANON_KEY) must be set in the .env file."
+            "SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in the .env file."
         )
         sys.exit(1)
     return create_client(url, key)
 
 
+def _build_sink(args: argparse.Namespace):
+    if args.sink == "sqlite":
+        return SqliteSink(args.sqlite_path)
+    if args.sink == "copy":
+        dsn = os.getenv("DATABASE_URL")
+        if not dsn:
+            logger.error("DATABASE_URL must be set in the .env file to use --sink copy.")
+            sys.exit(1)
+        from connectors.pg_copy import PostgresCopySink
+        try:
+            return PostgresCopySink(dsn)
+        except RuntimeError as exc:
+            logger.error("%s", exc)
+            sys.exit(1)
+    return SupabaseSink(_build_supabase_client())
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("Ignoring non-integer %s=%r (using %d).", name, value, default)
+        return default
+
+
 def _reset_kill_switch() -> None:
     if not STATE_FILE.exists():
         print("state.json does not exist — nothing to reset.")
@@ -69,6 +114,28 @@ def _reset_kill_switch() -> None:
     print("Kill switch reset for all sources.")
 
 
+def _archive(sink, retention_days: int, batch_size: int) -> None:
+    """
+    Move finished events to events_archive one batch (one transaction) at a
+    time until none are left.  Safe to interrupt and re-run, and to run
+    alongside a scrape.
+    """
+    retention = timedelta(days=retention_days)
+    moved = batches = 0
+    started = time.perf_counter()
+    while True:
+        count = sink.archive_events(retention, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+        logger.info("Archived batch %d: %d events (%d total).", batches, count, moved)
+    elapsed = time.perf_counter() - started
+    rate = moved / elapsed if elapsed > 0 else 0.0
+    print(f"Archived {moved} events older than {retention_days} days in {batches} batches, "
+          f"{elapsed:.1f} s ({rate:.0f} rows/s).")
+
+
 def _print_summary(result: dict, elapsed_ms: int) -> None:
     print()
     print("=" * 55)
@@ -76,10 +143,47 @@ def _print_summary(result: dict, elapsed_ms: int) -> None:
     print("=" * 55)
     print(f"  Timestamp : {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
     print(f"  Source    : getINVOLVED ({result.get('source', 'n/a')})")
+    if result.get("error"):
+        outcome = "failed"
+    elif result.get("not_modified"):
+        outcome = "not modified"
+    else:
+        outcome = "updated"
+    print(f"  Outcome   : {outcome}")
+    if result.get("mode"):
+        print(f"  Mode      : {result['mode']}")
+        print(f"  Bytes     : {result.get('bytes', 0):>6} downloaded, "
+              f"{result.get('bytes_saved', 0)} saved vs. last full sweep")
     print(f"  Fetched   : {result.get('fetched', 0):>6} events")
     print(f"  Inserted  : {result.get('inserted', 0):>6} new")
-    print(f"  Updated   : {result.get('updated', 0):>6} existing")
+    print(f"  Updated   : {result.get('updated', 0):>6} changed")
+    if "unchanged" in result:
+        print(f"  Unchanged : {result['unchanged']:>6} (last_seen only)")
+    if result.get("cancelled"):
+        print(f"  Cancelled : {result['cancelled']:>6} vanished from the source")
+    if result.get("organizations") is not None:
+        print(f"  Orgs      : {result['organizations']:>6} in typeahead")
+    conns = result.get("connections")
+    if conns:
+        print(f"  Conns     : {conns['opened']:>6} opened, {conns['reused']} reused")
+    cache = result.get("campus_cache")
+    if cache:
+        print(f"  Loc cache : {cache['hits']:>6} hits, {cache['misses']} misses")
+    ts = result.get("timestamps")
+    if ts:
+        print(f"  Times     : {ts['iso']:>6} iso, {ts['dateutil']} dateutil, "
+              f"{ts['native']} native, {ts['failed']} failed")
+    ups = result.get("upserts")
+    if ups and ups["chunks"]:
+        print(f"  Upserts   : {ups['chunks']:>6} chunks, {ups['retries']} retries, "
+              f"p50 {ups['p50_ms']} ms, max {ups['max_ms']} ms")
+    if result.get("quarantined"):
+        print(f"  Rejected  : {result['quarantined']:>6} quarantined (see {getinvolved.DEAD_LETTER_FILE.name})")
+    if result.get("first_write_ms") is not None:
+        print(f"  1st write : {result['first_write_ms']:>6} ms")
     print(f"  Duration  : {elapsed_ms:>6} ms")
+    if result.get("peak_rss_kb") is not None:
+        print(f"  Peak RSS  : {result['peak_rss_kb'] / 1024:>6.1f} MB")
     if result.get("error"):
         print(f"  ERROR     : {result['error']}")
     print("=" * 55)
@@ -92,28 +196,90 @@ def _print_summary(result: dict, elapsed_ms: int) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="RU Events Hub scraper runner")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Between full sweeps, fetch only events changed since the last "
+             "run (experimental: relies on the API's updatedAfter filter).",
+    )
+    parser.add_argument(
+        "--full-sweep",
+        action="store_true",
+        help="With --incremental, re-fetch every upcoming event this run anyway.",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=("supabase", "copy", "sqlite"),
+        default="supabase",
+        help="Where events are written: Supabase's REST API (default), "
+             "Postgres COPY via DATABASE_URL, or a local SQLite file.",
+    )
+    parser.add_argument(
+        "--sqlite-path",
+        type=Path,
+        default=SQLITE_FILE,
+        help=f"SQLite file for --sink sqlite (default: {SQLITE_FILE.name}).",
+    )
     parser.add_argument(
         "--reset-kill-switch",
         action="store_true",
         help="Clear the kill switch in state.json and exit.",
     )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Move events that ended more than --retention-days ago into "
+             "events_archive and exit (no scrape).",
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=ARCHIVE_RETENTION_DAYS,
+        help=f"Days after an event ends before --archive moves it (default: {ARCHIVE_RETENTION_DAYS}).",
+    )
+    parser.add_argument(
+        "--archive-batch",
+        type=int,
+        default=ARCHIVE_BATCH_SIZE,
+        help=f"Events moved per transaction by --archive (default: {ARCHIVE_BATCH_SIZE}).",
+    )
     args = parser.parse_args()
 
     if args.reset_kill_switch:
         _reset_kill_switch()
         return
 
+    if args.archive:
+        sink = _build_sink(args)
+        try:
+            _archive(sink, args.retention_days, args.archive_batch)
+        except Exception as exc:
+            logger.exception("Archiving failed: %s", exc)
+            sys.exit(1)
+        finally:
+            sink.close()
+        return
+
     logger.info("Starting RU Events Hub scraper …")
 
-    client = _build_supabase_client()
+    sink = _build_sink(args)
 
     start = datetime.now(timezone.utc)
     try:
-        result = getinvolved.run(client)
+        result = getinvolved.run(
+            sink,
+            pool_size=_env_int("SCRAPER_POOL_SIZE", getinvolved.POOL_SIZE),
+            batch_size=_env_int("SCRAPER_BATCH_SIZE", getinvolved.BATCH_SIZE),
+            upsert_workers=_env_int("SCRAPER_UPSERT_WORKERS", getinvolved.UPSERT_WORKERS),
+            full_sweep=args.full_sweep,
+            incremental=args.incremental,
+        )
     except Exception as exc:
         logger.exception("Unexpected error during scrape: %s", exc)
         result = {"fetched": 0, "inserted": 0, "updated": 0,
                   "source": "none", "error": str(exc)}
+    finally:
+        sink.close()
 
     elapsed_ms = int((datetime.now(timezone.utc) - start).total_seconds() * 1000)
 
@@ -1,5 +1,6 @@
 -- RU Events Hub: events table
--- Run this once in the Supabase SQL editor to set up your schema.
+-- Run this once in the Supabase SQL editor to set up your schema, then
+-- apply the files in migrations/ in numeric order.
 
 CREATE TABLE IF NOT EXISTS events (
     id          uuid        PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -15,17 +16,215 @@ CREATE TABLE IF NOT EXISTS events (
     category    text,
     source_url  text        NOT NULL,
     last_seen   timestamptz NOT NULL DEFAULT now(),
-    created_at  timestamptz NOT NULL DEFAULT now()
+    created_at  timestamptz NOT NULL DEFAULT now(),
+    content_hash text       -- hash of the normalized fields except last_seen
 );
 
--- Useful indexes
-CREATE INDEX IF NOT EXISTS events_source_idx     ON events (source);
-CREATE INDEX IF NOT EXISTS events_campus_idx     ON events (campus);
-CREATE INDEX IF NOT EXISTS events_start_time_idx ON events (start_time);
+-- Existing installs: add the fingerprint column in place.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS content_hash text;
 
--- Allow the scraper (anon key) to read and write.
--- If you have RLS enabled, add the policy below; otherwise skip it.
+-- Useful indexes (the composites are the ones 001 describes; single-column
+-- source / campus indexes would be redundant with their leading columns)
+CREATE INDEX IF NOT EXISTS events_campus_start_idx ON events (campus, start_time);
+CREATE INDEX IF NOT EXISTS events_source_start_idx ON events (source, start_time);
+CREATE INDEX IF NOT EXISTS events_start_time_idx   ON events (start_time);
+
+-- Stored fingerprints for one source as a single JSON object
+-- ({event_id: content_hash}), so the scraper gets them in one request no
+-- matter how many rows PostgREST would otherwise return.  Only events the
+-- API can still return are included: the scraper asks for events ending
+-- after today, and a day's margin covers that date being read in local
+-- time.  Past events would otherwise grow the object without bound.
+CREATE OR REPLACE FUNCTION event_fingerprints(p_source text)
+RETURNS jsonb
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(jsonb_object_agg(event_id, content_hash), '{}'::jsonb)
+    FROM events
+    WHERE source = p_source
+      AND coalesce(end_time, start_time) >= now() - interval '1 day';
+$$;
+
+-- touch_events() and upsert_events() are created here only when missing:
+-- migrations 005 and 007 redefine them, and re-running this file must not
+-- put the original versions back.
+
+-- Bump last_seen for events whose content did not change.
+DO $do$
+BEGIN
+    IF to_regprocedure('touch_events(text[])') IS NULL THEN
+        CREATE FUNCTION touch_events(p_event_ids text[])
+        RETURNS integer
+        LANGUAGE sql AS $$
+            WITH touched AS (
+                UPDATE events SET last_seen = now()
+                WHERE event_id = ANY (p_event_ids)
+                RETURNING 1
+            )
+            SELECT count(*)::integer FROM touched;
+        $$;
+    END IF;
+END
+$do$;
+
+-- Sync one chunk in a single round trip: upsert new and changed rows
+-- (p_events, a JSON array of event rows including content_hash) and bump
+-- last_seen for unchanged ones (p_touch_ids).  Returns
+-- {"inserted", "updated", "unchanged"}; xmax = 0 on a returned row means
+-- the INSERT created it rather than the ON CONFLICT branch updating it.
+DO $do$
+BEGIN
+    IF to_regprocedure('upsert_events(jsonb,text[])') IS NULL THEN
+        CREATE FUNCTION upsert_events(p_events jsonb,
+                                      p_touch_ids text[] DEFAULT '{}')
+        RETURNS jsonb
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v_inserted  integer;
+            v_updated   integer;
+        BEGIN
+            WITH upserted AS (
+                INSERT INTO events (event_id, source, title, description, start_time,
+                                    end_time, location, campus, organization, category,
+                                    source_url, last_seen, content_hash)
+                SELECT event_id, source, title, description, start_time,
+                       end_time, location, campus, organization, category,
+                       source_url, last_seen, content_hash
+                FROM jsonb_to_recordset(p_events) AS e (
+                    event_id text, source text, title text, description text,
+                    start_time timestamptz, end_time timestamptz, location text,
+                    campus text, organization text, category text, source_url text,
+                    last_seen timestamptz, content_hash text)
+                ON CONFLICT (event_id) DO UPDATE SET
+                    source       = excluded.source,
+                    title        = excluded.title,
+                    description  = excluded.description,
+                    start_time   = excluded.start_time,
+                    end_time     = excluded.end_time,
+                    location     = excluded.location,
+                    campus       = excluded.campus,
+                    organization = excluded.organization,
+                    category     = excluded.category,
+                    source_url   = excluded.source_url,
+                    last_seen    = excluded.last_seen,
+                    content_hash = excluded.content_hash
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+            INTO v_inserted, v_updated
+            FROM upserted;
+
+            RETURN jsonb_build_object(
+                'inserted',  v_inserted,
+                'updated',   v_updated,
+                'unchanged', touch_events(p_touch_ids)
+            );
+        END;
+        $$;
+    END IF;
+END
+$do$;
+
+-- Only the scraper (service role) may write through these; PostgREST
+-- would otherwise expose them to anyone holding the public anon key.
+REVOKE EXECUTE ON FUNCTION touch_events(text[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION upsert_events(jsonb, text[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION touch_events(text[]) TO service_role;
+GRANT EXECUTE ON FUNCTION upsert_events(jsonb, text[]) TO service_role;
+
+-- Row counts per (source, campus), kept current by statement-level
+-- triggers so the scraper's safety check is a primary-key lookup instead
+-- of count(*) over the source.  Campus is '' where the event has none.
+CREATE TABLE IF NOT EXISTS event_counts (
+    source  text   NOT NULL,
+    campus  text   NOT NULL,
+    n       bigint NOT NULL,
+    PRIMARY KEY (source, campus)
+);
+
+-- Only the scraper's writes should move these counters, and its safety
+-- check trusts them.  The service role bypasses RLS; with RLS on and no
+-- policies, plus the revoke, the anon key cannot read or change them.
+ALTER TABLE event_counts ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON TABLE event_counts FROM anon, authenticated;
+
+-- Applies one statement's net change per (source, campus).  Keys are
+-- locked in sorted order so concurrent writers cannot deadlock on them;
+-- statements that don't move rows between keys (e.g. touch_events) write
+-- nothing.
+CREATE OR REPLACE FUNCTION event_counts_apply()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO event_counts (source, campus, n)
+        SELECT source, coalesce(campus, ''), count(*)
+        FROM new_rows
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (source, campus) DO UPDATE SET n = event_counts.n + excluded.n;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO event_counts (source, campus, n)
+        SELECT source, coalesce(campus, ''), -count(*)
+        FROM old_rows
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (source, campus) DO UPDATE SET n = event_counts.n + excluded.n;
+    ELSE
+        INSERT INTO event_counts (source, campus, n)
+        SELECT source, campus, sum(delta)
+        FROM (
+            SELECT source, coalesce(campus, '') AS campus, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT source, coalesce(campus, ''), 1 FROM new_rows
+        ) AS moved
+        GROUP BY 1, 2
+        HAVING sum(delta) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (source, campus) DO UPDATE SET n = event_counts.n + excluded.n;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION event_counts_reset()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM event_counts;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS events_count_insert   ON events;
+DROP TRIGGER IF EXISTS events_count_update   ON events;
+DROP TRIGGER IF EXISTS events_count_delete   ON events;
+DROP TRIGGER IF EXISTS events_count_truncate ON events;
+CREATE TRIGGER events_count_insert AFTER INSERT ON events
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+CREATE TRIGGER events_count_update AFTER UPDATE ON events
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+CREATE TRIGGER events_count_delete AFTER DELETE ON events
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_apply();
+CREATE TRIGGER events_count_truncate AFTER TRUNCATE ON events
+    FOR EACH STATEMENT EXECUTE FUNCTION event_counts_reset();
+
+-- (Re)build the counters from scratch; also run this after setting up an
+-- existing install.
+INSERT INTO event_counts (source, campus, n)
+SELECT source, coalesce(campus, ''), count(*) FROM events GROUP BY 1, 2
+ON CONFLICT (source, campus) DO UPDATE SET n = excluded.n;
+
+-- Stored events for one source, from the counters.
+CREATE OR REPLACE FUNCTION stored_event_count(p_source text)
+RETURNS bigint
+LANGUAGE sql STABLE AS $$
+    SELECT coalesce(sum(n), 0)::bigint FROM event_counts WHERE source = p_source;
+$$;
+
+-- The scraper writes with the service role key, which bypasses RLS.
+-- If you have RLS enabled, let the app read with the anon key:
 -- ALTER TABLE events ENABLE ROW LEVEL SECURITY;
 -- CREATE POLICY "anon can read events"  ON events FOR SELECT USING (true);
--- CREATE POLICY "anon can upsert events" ON events FOR INSERT WITH CHECK (true);
--- CREATE POLICY "anon can update events" ON events FOR UPDATE USING (true);